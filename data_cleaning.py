@@ -3,10 +3,247 @@ Sales Data Cleaning Script
 Cleans and validates sales transaction data from sales_data.txt
 """
 
+import bisect
+import csv
 import re
+import numpy as np
 import pandas as pd
 
-def clean_sales_data(input_file='sales_data.txt', output_file='cleaned_sales_data.csv'):
+from utils.columnar_cache import file_signature, get_cache_path, load_frame, save_frame
+
+# Counts stored with the cached data, printed again on a cache hit
+CACHED_COUNTS = {'total_parsed', 'invalid_removed', 'malformed', 'removed'}
+
+
+def load_cleaned_cache(input_file, signature):
+    """
+    Loads previously cleaned data for input_file from the Parquet cache
+    Returns: tuple (DataFrame, counts) with the counts and removed
+             records of the run that made the cache, or None if there is
+             no readable cache, it was made from another file or another
+             version of it (signature), or no Parquet engine is installed
+    """
+    cached = load_frame(get_cache_path(input_file))
+    if cached is None or cached[1].get('signature') != signature:
+        return None
+    df, metadata = cached
+    counts = metadata.get('counts')
+    if not isinstance(counts, dict) or not CACHED_COUNTS <= counts.keys():
+        return None
+    return df, counts
+
+
+def save_cleaned_cache(df, input_file, signature, counts):
+    """
+    Saves cleaned data to the Parquet cache (skipped if no Parquet engine
+    is installed); a failed write only prints a warning
+    """
+    try:
+        save_frame(df, get_cache_path(input_file), {'signature': signature, 'counts': counts})
+    except Exception as e:
+        print(f"⚠ Warning: Could not cache cleaned data: {e}")
+
+
+def print_removed(removed, invalid_removed, malformed):
+    """Prints the first removed records (line number and reasons) and how many more there were"""
+    for line_num, reason in removed:
+        print(f"Line {line_num}: {reason} - REMOVED")
+    if invalid_removed > len(removed):
+        print(f"... and {invalid_removed - len(removed)} more removed records")
+    if malformed:
+        print(f"Lines with invalid number of fields: {malformed}")
+
+
+def print_results(df, output_file, total_parsed, invalid_removed, verbose):
+    """Prints the validation counts and where the cleaned data was saved"""
+    valid_count = len(df) if df is not None else 0
+    
+    # Print validation output
+    print("\n" + "="*60)
+    print("VALIDATION OUTPUT:")
+    print("="*60)
+    print(f"Total records parsed: {total_parsed}")
+    print(f"Invalid records removed: {invalid_removed}")
+    print(f"Valid records after cleaning: {valid_count}")
+    print("="*60)
+    
+    # Save cleaned data to CSV
+    if valid_count:
+        print(f"\n✓ Cleaned data saved to: {output_file}")
+        if verbose:
+            print(f"\nSample of cleaned data:")
+            print(df.head())
+    else:
+        print("\n✗ No valid records found!")
+
+
+# Removed records printed with their line number and reasons
+REMOVED_SAMPLE_SIZE = 10
+
+
+def scan_input(input_file):
+    """
+    Reads the raw input once to count its data lines
+    Returns: dictionary with
+    - total_parsed: non-empty lines after the header
+    - malformed_lines: 0-based line numbers of the lines without exactly
+                       8 fields
+    - skip_lines: 0-based line numbers the parser is told to skip (the
+                  malformed lines, and blank lines it would not skip itself)
+    - malformed_sample: (line number, field count) of the first of them
+    - skipped_at: for every line the parser does not return (blank or
+                  malformed), the position of the next row it does return
+    
+    Lines are split like the parser splits them ('\n', '\r\n' or a lone
+    '\r', read in text mode with universal newlines), so line numbers
+    match the parser's rows. Only lines the parser drops are recorded, so
+    memory stays small for large files; skipped_at is enough to map a row
+    back to its line.
+    """
+    scan = {'total_parsed': 0, 'malformed_lines': [], 'skip_lines': [],
+            'malformed_sample': [], 'skipped_at': []}
+    row = 0  # position of the next row the parser will return
+    
+    with open(input_file, 'r', encoding='utf-8', errors='ignore') as file:
+        next(file, None)  # Skip header
+        for line_index, line in enumerate(file, start=1):
+            if not line.strip():
+                # The parser only skips lines of spaces and tabs by itself
+                if line.strip(' \t\n'):
+                    scan['skip_lines'].append(line_index)
+                scan['skipped_at'].append(row)
+                continue
+            scan['total_parsed'] += 1
+            
+            fields = line.count('|') + 1
+            if fields != 8:
+                scan['malformed_lines'].append(line_index)
+                scan['skip_lines'].append(line_index)
+                scan['skipped_at'].append(row)
+                if len(scan['malformed_sample']) < REMOVED_SAMPLE_SIZE:
+                    scan['malformed_sample'].append((line_index + 1, f"Invalid number of fields ({fields} fields)"))
+                continue
+            row += 1
+    
+    return scan
+
+
+def line_number(scan, row):
+    """Returns: 1-based line number of the row at position row of the parser's output"""
+    return row + 2 + bisect.bisect_right(scan['skipped_at'], row)
+
+
+# Largest magnitude a float64 holds every whole number up to, exactly
+EXACT_INT_LIMIT = 2**53
+
+
+def exact_quantity(text):
+    """
+    Converts one Quantity text with int()
+    Returns: the value as a float, or NaN if it is not a whole number or
+             does not survive the round trip through float64 and int64
+             (it could not be stored in the cleaned int64 column)
+    """
+    try:
+        value = int(text)
+    except ValueError:
+        return np.nan
+    converted = float(value)
+    if not -2**63 <= value < 2**63 or int(converted) != value:
+        return np.nan
+    return converted
+
+
+def parse_quantity(text):
+    """
+    Converts Quantity text (commas already removed) to numbers
+    Returns: float64 Series, NaN where the text is not a whole number as
+             int() reads it ('1e2', '1.0' or 'inf' are rejected) or the
+             value is out of range for the int64 column
+    
+    Plain ASCII digit strings are converted in one vectorized call. The
+    rest (other forms int() accepts, such as '1_000' or non-ASCII digits,
+    invalid text, and very large values) go through exact_quantity() one
+    by one, so exactly the values int() accepts are kept.
+    """
+    digits = text.str.fullmatch(r'[+-]?[0-9]+', na=False)
+    quantity = pd.to_numeric(text.where(digits), errors='coerce').astype(np.float64)
+    slow = (~digits | (quantity.abs() >= EXACT_INT_LIMIT)).to_numpy()
+    if slow.any():
+        quantity[slow] = [exact_quantity(value) for value in text[slow].tolist()]
+    return quantity
+
+
+def exact_unit_price(text):
+    """Converts one UnitPrice text with float(); returns NaN if it is not a number"""
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+def parse_unit_price(text):
+    """
+    Converts UnitPrice text (commas already removed) to numbers
+    Returns: float64 Series, NaN where float() cannot read the text
+    
+    Text the vectorized conversion cannot read ('1_000.5', non-ASCII
+    digits) is retried with float(), so the values float() accepts are
+    kept. A literal 'nan' price stays NaN, so the record is removed.
+    """
+    unit_price = pd.to_numeric(text, errors='coerce').astype(np.float64)
+    slow = unit_price.isna().to_numpy()
+    if slow.any():
+        unit_price[slow] = [exact_unit_price(value) for value in text[slow].tolist()]
+    return unit_price
+
+
+def validate_records(records):
+    """
+    Applies the validation rules to a whole block of records at once
+    Parameters: DataFrame of stripped fields with Quantity/UnitPrice
+                already converted to numbers (NaN if unparseable)
+    Returns: dictionary mapping each removal reason to a boolean
+             numpy array (True where the record passes that rule)
+    """
+    quantity = records['Quantity'].to_numpy()
+    unit_price = records['UnitPrice'].to_numpy()
+    
+    return {
+        "Invalid TransactionID format": records['TransactionID'].str.startswith('T', na=False).to_numpy(),
+        "Missing CustomerID": (records['CustomerID'].fillna('') != '').to_numpy(),
+        "Missing Region": (records['Region'].fillna('') != '').to_numpy(),
+        "Invalid Quantity": quantity > 0,
+        "Invalid UnitPrice": unit_price > 0
+    }
+
+
+def removal_reasons(record, raw_quantity, raw_unit_price, failed):
+    """
+    Describes why a record was removed, with the offending values
+    Parameters: record (row with Quantity/UnitPrice converted), the raw
+                Quantity and UnitPrice text, failed (names of the rules
+                from validate_records() the record breaks)
+    Returns: comma-separated reasons, e.g. "Invalid Quantity (0 <= 0)"
+    """
+    reasons = []
+    for reason in failed:
+        if reason == "Invalid Quantity":
+            if pd.isna(record['Quantity']):
+                reason = f"Invalid Quantity format: {raw_quantity}"
+            else:
+                reason = f"Invalid Quantity ({int(record['Quantity'])} <= 0)"
+        elif reason == "Invalid UnitPrice":
+            if pd.isna(record['UnitPrice']):
+                reason = f"Invalid UnitPrice format: {raw_unit_price}"
+            else:
+                reason = f"Invalid UnitPrice ({float(record['UnitPrice'])} <= 0)"
+        reasons.append(reason)
+    return ', '.join(reasons)
+
+
+def clean_sales_data(input_file='sales_data.txt', output_file='cleaned_sales_data.csv', chunksize=200_000,
+                     use_cache=True, verbose=False):
     """
     Clean sales data by removing invalid records and fixing data quality issues
     
@@ -20,140 +257,137 @@ def clean_sales_data(input_file='sales_data.txt', output_file='cleaned_sales_dat
     - Remove commas from ProductName
     - Remove commas from numbers (e.g., 1,500 -> 1500)
     - Skip empty lines
+    
+    The file is read and written in chunks of `chunksize` rows so large
+    inputs never have to be held in memory as raw text.
+    If output_file ends with '.parquet' the cleaned data is saved as
+    Parquet instead of CSV (requires pyarrow or fastparquet).
+    
+    With use_cache, the cleaned data is also kept as Parquet in the cache
+    directory (utils.columnar_cache.CACHE_DIR)
+    and reused on later runs while the input file (same absolute path,
+    size and modification time) is unchanged.
+    With verbose, a sample of the cleaned data is printed at the end.
     """
     
     # Counters
-    total_parsed = 0
     invalid_removed = 0
-    valid_records = []
+    valid_chunks = []
+    rejects = []
     
     # Column names
     columns = ['TransactionID', 'Date', 'ProductID', 'ProductName', 
                'Quantity', 'UnitPrice', 'CustomerID', 'Region']
+    write_parquet = output_file.endswith('.parquet')
     
     print("Starting data cleaning process...")
     print("="*60)
     
     try:
-        # Read file with proper encoding handling
-        with open(input_file, 'r', encoding='utf-8', errors='ignore') as file:
-            lines = file.readlines()
+        # Reuse the cleaned data from an earlier run if the input is unchanged
+        signature = file_signature(input_file)
+        cached = load_cleaned_cache(input_file, signature) if use_cache else None
+        if cached is not None:
+            df, counts = cached
+            if write_parquet:
+                df.to_parquet(output_file, index=False)
+            else:
+                df.to_csv(output_file, index=False)
+            print(f"✓ Loaded {len(df)} cleaned records from cache: {get_cache_path(input_file)}")
+            print_removed(counts['removed'], counts['invalid_removed'], counts['malformed'])
+            print_results(df, output_file, counts['total_parsed'], counts['invalid_removed'], verbose)
+            return df
         
-        # Skip header line and process data
-        for line_num, line in enumerate(lines[1:], start=2):
-            # Skip empty lines
-            line = line.strip()
-            if not line:
-                continue
-            
-            total_parsed += 1
-            
-            # Split by pipe delimiter
-            fields = line.split('|')
-            
-            # Check if we have correct number of fields
-            if len(fields) != 8:
-                print(f"Line {line_num}: Invalid number of fields ({len(fields)} fields) - REMOVED")
-                invalid_removed += 1
-                continue
-            
-            # Extract fields
-            transaction_id = fields[0].strip()
-            date = fields[1].strip()
-            product_id = fields[2].strip()
-            product_name = fields[3].strip()
-            quantity_str = fields[4].strip()
-            unit_price_str = fields[5].strip()
-            customer_id = fields[6].strip()
-            region = fields[7].strip()
+        # Count non-empty data lines and find the ones with the wrong number of fields
+        scan = scan_input(input_file)
+        total_parsed = scan['total_parsed']
+        rows_read = 0
+        
+        # Read file with pandas' C parser (blank lines and leading spaces skipped).
+        # The schema is fixed, so column names and types are given up front:
+        # everything is read as text and the numbers are converted after cleaning.
+        # The format has no quoting, so a '"' in a field is kept as is. Lines with
+        # the wrong number of fields are skipped up front: the parser would pad
+        # short ones with empty fields instead of rejecting them.
+        reader = pd.read_csv(input_file, sep='|', header=0, names=columns,
+                             dtype={col: str for col in columns}, skipinitialspace=True,
+                             skiprows=scan['skip_lines'], keep_default_na=False,
+                             skip_blank_lines=True, on_bad_lines='skip', quoting=csv.QUOTE_NONE,
+                             encoding='utf-8', encoding_errors='ignore', engine='c',
+                             chunksize=chunksize)
+        
+        for chunk in reader:
+            # Strip surrounding whitespace from every field (the tokenizer only
+            # drops leading spaces, not tabs or other whitespace)
+            for col in chunk.columns:
+                chunk[col] = chunk[col].str.strip()
             
-            # Validation flags
-            is_valid = True
-            removal_reason = []
+            raw_quantity = chunk['Quantity']
+            raw_unit_price = chunk['UnitPrice']
             
-            # Rule 1: TransactionID must start with 'T'
-            if not transaction_id.startswith('T'):
-                is_valid = False
-                removal_reason.append("Invalid TransactionID format")
+            # Remove commas from numbers and convert (unparseable values become NaN)
+            chunk['Quantity'] = parse_quantity(chunk['Quantity'].str.replace(',', '', regex=False))
+            chunk['UnitPrice'] = parse_unit_price(chunk['UnitPrice'].str.replace(',', '', regex=False))
             
-            # Rule 2: CustomerID cannot be missing
-            if not customer_id:
-                is_valid = False
-                removal_reason.append("Missing CustomerID")
+            # Validation rules, one boolean column each
+            rules = validate_records(chunk)
+            mask = np.ones(len(chunk), dtype=bool)
+            for ok in rules.values():
+                mask &= ok
+            invalid_removed += int((~mask).sum())
             
-            # Rule 3: Region cannot be missing
-            if not region:
-                is_valid = False
-                removal_reason.append("Missing Region")
+            # Keep only the first rejected records with their reasons (reported at the end)
+            for i in np.flatnonzero(~mask)[:REMOVED_SAMPLE_SIZE - len(rejects)].tolist():
+                record = chunk.iloc[i]
+                failed = [reason for reason, ok in rules.items() if not ok[i]]
+                reasons = removal_reasons(record, raw_quantity.iloc[i], raw_unit_price.iloc[i], failed)
+                rejects.append((line_number(scan, rows_read + i), f"{record['TransactionID']} - {reasons}"))
+            rows_read += len(chunk)
             
-            # Rule 4: Quantity must be > 0
-            try:
-                # Clean commas from quantity
-                quantity_clean = quantity_str.replace(',', '')
-                quantity = int(quantity_clean)
-                if quantity <= 0:
-                    is_valid = False
-                    removal_reason.append(f"Invalid Quantity ({quantity} <= 0)")
-            except ValueError:
-                is_valid = False
-                removal_reason.append(f"Invalid Quantity format: {quantity_str}")
+            # Clean valid records: one numpy array per column, wrapped in a DataFrame
+            if not mask.any():
+                continue
+            valid_columns = {col: chunk[col].to_numpy()[mask] for col in columns}
+            valid_columns['Quantity'] = valid_columns['Quantity'].astype(np.int64)
+            valid_columns['UnitPrice'] = valid_columns['UnitPrice'].astype(np.float64)
+            valid = pd.DataFrame(valid_columns)
             
-            # Rule 5: UnitPrice must be > 0
-            try:
-                # Clean commas from price
-                price_clean = unit_price_str.replace(',', '')
-                unit_price = float(price_clean)
-                if unit_price <= 0:
-                    is_valid = False
-                    removal_reason.append(f"Invalid UnitPrice ({unit_price} <= 0)")
-            except ValueError:
-                is_valid = False
-                removal_reason.append(f"Invalid UnitPrice format: {unit_price_str}")
+            # Remove commas from ProductName
+            valid['ProductName'] = valid['ProductName'].str.replace(',', ' ', regex=False)
             
-            # Process record based on validity
-            if not is_valid:
-                print(f"Line {line_num}: {transaction_id} - {', '.join(removal_reason)} - REMOVED")
-                invalid_removed += 1
-            else:
-                # Clean valid record
-                # Remove commas from ProductName
-                product_name_clean = product_name.replace(',', ' ')
-                
-                # Add to valid records
-                valid_records.append({
-                    'TransactionID': transaction_id,
-                    'Date': date,
-                    'ProductID': product_id,
-                    'ProductName': product_name_clean,
-                    'Quantity': quantity,
-                    'UnitPrice': unit_price,
-                    'CustomerID': customer_id,
-                    'Region': region
-                })
+            # Append to the output CSV (header only with the first chunk)
+            if not write_parquet:
+                valid.to_csv(output_file, mode='a' if valid_chunks else 'w',
+                             header=not valid_chunks, index=False)
+            valid_chunks.append(valid)
         
-        # Calculate valid records
-        valid_count = len(valid_records)
+        # Lines with the wrong number of fields
+        malformed = len(scan['malformed_lines'])
+        invalid_removed += malformed
         
-        # Print validation output
-        print("\n" + "="*60)
-        print("VALIDATION OUTPUT:")
-        print("="*60)
-        print(f"Total records parsed: {total_parsed}")
-        print(f"Invalid records removed: {invalid_removed}")
-        print(f"Valid records after cleaning: {valid_count}")
-        print("="*60)
+        # Combine cleaned chunks
+        df = pd.concat(valid_chunks, ignore_index=True) if valid_chunks else None
+        valid_count = len(df) if df is not None else 0
         
-        # Save cleaned data to CSV
-        if valid_records:
-            df = pd.DataFrame(valid_records)
-            df.to_csv(output_file, index=False)
-            print(f"\n✓ Cleaned data saved to: {output_file}")
-            print(f"\nSample of cleaned data:")
-            print(df.head())
-        else:
-            print("\n✗ No valid records found!")
+        # The first removed records in file order
+        removed = sorted(rejects + scan['malformed_sample'])[:REMOVED_SAMPLE_SIZE]
         
-        return df if valid_records else None
+        # Few distinct regions: store them as category codes for fast grouping
+        if valid_count:
+            df['Region'] = df['Region'].astype('category')
+            if use_cache:
+                save_cleaned_cache(df, input_file, signature,
+                                   {'total_parsed': total_parsed, 'invalid_removed': invalid_removed,
+                                    'malformed': malformed, 'removed': removed})
+        
+        # Parquet is columnar and typed, so it is written in one go
+        if write_parquet and valid_count:
+            df.to_parquet(output_file, index=False)
+        
+        print_removed(removed, invalid_removed, malformed)
+        
+        print_results(df, output_file, total_parsed, invalid_removed, verbose)
+        return df
         
     except FileNotFoundError:
         print(f"✗ Error: File '{input_file}' not found!")
@@ -166,7 +400,12 @@ def clean_sales_data(input_file='sales_data.txt', output_file='cleaned_sales_dat
 def analyze_cleaned_data(df):
     """
     Perform basic analysis on cleaned data
+    df can be the DataFrame from clean_sales_data() or the path of a
+    cleaned .csv/.parquet file
     """
+    if isinstance(df, str):
+        df = pd.read_parquet(df) if df.endswith('.parquet') else pd.read_csv(df)
+    
     if df is None or df.empty:
         print("No data to analyze!")
         return
@@ -175,29 +414,29 @@ def analyze_cleaned_data(df):
     print("DATA ANALYSIS:")
     print("="*60)
     
+    # Revenue per transaction, computed once and reused below
+    df = df.assign(Revenue=df['Quantity'].to_numpy() * df['UnitPrice'].to_numpy())
+    
     # Summary statistics
-    print(f"\nTotal Revenue: ₹{(df['Quantity'] * df['UnitPrice']).sum():,.2f}")
+    print(f"\nTotal Revenue: ₹{df['Revenue'].sum():,.2f}")
     print(f"Total Quantity Sold: {df['Quantity'].sum():,}")
-    print(f"Average Transaction Value: ₹{(df['Quantity'] * df['UnitPrice']).mean():,.2f}")
+    print(f"Average Transaction Value: ₹{df['Revenue'].mean():,.2f}")
     
     # By Region
     print("\n--- Sales by Region ---")
-    region_sales = df.groupby('Region').agg({
-        'Quantity': 'sum',
-        'UnitPrice': lambda x: (df.loc[x.index, 'Quantity'] * x).sum()
-    }).rename(columns={'UnitPrice': 'Revenue'})
+    region_sales = df.groupby('Region', observed=True).agg(Quantity=('Quantity', 'sum'),
+                                                           Revenue=('Revenue', 'sum'))
     print(region_sales)
     
     # Top Products
     print("\n--- Top 5 Products by Revenue ---")
-    df['Revenue'] = df['Quantity'] * df['UnitPrice']
-    top_products = df.groupby('ProductName')['Revenue'].sum().sort_values(ascending=False).head(5)
+    top_products = df.groupby('ProductName', sort=False)['Revenue'].sum().nlargest(5)
     print(top_products)
 
 
 if __name__ == "__main__":
     # Clean the data
-    cleaned_df = clean_sales_data('data/sales_data.txt', 'cleaned_sales_data.csv')
+    cleaned_df = clean_sales_data('data/sales_data.txt', 'cleaned_sales_data.csv', verbose=True)
     
     # Analyze cleaned data
     if cleaned_df is not None:
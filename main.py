@@ -3,6 +3,10 @@ Sales Analytics System - Main Program
 Orchestrates the entire data processing pipeline
 """
 
+import sys
+
+import numpy as np
+
 from utils.file_handler import read_sales_data
 from utils.file_handler import parse_transactions, validate_and_filter
 from utils.data_processor import (
@@ -13,14 +17,19 @@ from utils.data_processor import (
     daily_sales_trend,
     find_peak_sales_day,
     low_performing_products,
-    generate_sales_report
+    generate_sales_report,
+    SalesColumns
 )
 from utils.api_handler import (
     fetch_all_products,
     create_product_mapping,
     enrich_sales_data,
-    save_enriched_data
+    save_enriched_data,
+    save_enriched_data_parquet,
+    PRODUCTS_CACHE_FILE,
+    PRODUCTS_CACHE_TTL
 )
+from utils.columnar_cache import load_cache, save_cache
 
 def print_separator(char='=', length=80):
     """Print a separator line"""
@@ -38,25 +47,23 @@ def get_user_input(prompt, valid_options=None):
             return response
         print(f"Invalid input. Please enter one of: {', '.join(valid_options)}")
 
-def display_filter_options(transactions):
+def display_filter_options(regions, amounts):
     """Display available filter options to user"""
     print("\nFilter Options Available:")
     print("-" * 60)
     
     # Show available regions
-    regions = sorted(set(t['Region'] for t in transactions if t.get('Region')))
     print(f"Regions: {', '.join(regions)}")
     
     # Show amount range
-    amounts = [t['Quantity'] * t['UnitPrice'] for t in transactions]
-    if amounts:
-        min_amount = min(amounts)
-        max_amount = max(amounts)
+    if amounts.size:
+        min_amount = amounts.min()
+        max_amount = amounts.max()
         print(f"Amount Range: ₹{min_amount:,.2f} - ₹{max_amount:,.2f}")
     
     print("-" * 60)
 
-def apply_filters(transactions):
+def apply_filters(transactions, regions, region_set):
     """Ask user for filter criteria and apply"""
     
     # Ask if user wants to filter
@@ -70,11 +77,10 @@ def apply_filters(transactions):
     print("-" * 60)
     
     # Filter by region
-    regions = sorted(set(t['Region'] for t in transactions if t.get('Region')))
     print(f"\nAvailable regions: {', '.join(regions)}")
-    filter_region = input("Enter region to filter (or press Enter to skip): ").strip()
+    filter_region = input("Enter region to filter (or press Enter to skip): ").strip() or None
     
-    if filter_region and filter_region not in regions:
+    if filter_region is not None and filter_region not in region_set:
         print(f"⚠ Warning: '{filter_region}' not found. Skipping region filter.")
         filter_region = None
     
@@ -99,9 +105,11 @@ def apply_filters(transactions):
     
     return transactions, filter_region, min_amount, max_amount
 
-def main():
+def main(save_parquet=False):
     """
     Main execution function
+    Set save_parquet (python main.py --parquet) to also write the enriched
+    data as data/enriched_sales_data.parquet
     Workflow:
     1. Print welcome message
     2. Read sales data file (handle encoding)
@@ -172,8 +180,14 @@ def main():
         # ========================================
         print_step(3, TOTAL_STEPS, "Filter Options")
         try:
-            display_filter_options(transactions)
-            transactions_to_process, filter_region, min_amount, max_amount = apply_filters(transactions)
+            # Regions and amounts are shared by the display and the filter prompts
+            region_set = set(t['Region'] for t in transactions if t.get('Region'))
+            regions = sorted(region_set)
+            amounts = np.fromiter((t['Quantity'] * t['UnitPrice'] for t in transactions),
+                                  dtype=np.float64, count=len(transactions))
+            
+            display_filter_options(regions, amounts)
+            transactions_to_process, filter_region, min_amount, max_amount = apply_filters(transactions, regions, region_set)
         except Exception as e:
             print(f"⚠ Warning: Error with filters: {e}")
             print("Continuing without filters...")
@@ -212,15 +226,17 @@ def main():
         # STEP 5: ANALYZE SALES DATA
         # ========================================
         print_step(5, TOTAL_STEPS, "Analyzing sales data...")
+        sales_columns = valid_trans
         try:
-            # Calculate all metrics
-            total_revenue = calculate_total_revenue(valid_trans)
-            region_stats = region_wise_sales(valid_trans)
-            top_products = top_selling_products(valid_trans, n=5)
-            customer_stats = customer_analysis(valid_trans)
-            daily_trend = daily_sales_trend(valid_trans)
-            peak_day = find_peak_sales_day(valid_trans)
-            low_products = low_performing_products(valid_trans, threshold=10)
+            # Calculate all metrics (on columns built once, reused by the report)
+            sales_columns = SalesColumns(valid_trans)
+            total_revenue = calculate_total_revenue(sales_columns)
+            region_stats = region_wise_sales(sales_columns)
+            top_products = top_selling_products(sales_columns, n=5)
+            customer_stats = customer_analysis(sales_columns)
+            daily_trend = daily_sales_trend(sales_columns)
+            peak_day = find_peak_sales_day(sales_columns)
+            low_products = low_performing_products(sales_columns, threshold=10)
             
             print(f"✓ Analysis complete")
             print(f"  Total Revenue: ₹{total_revenue:,.2f}")
@@ -232,31 +248,49 @@ def main():
             print(f"⚠ Warning: Error in analysis: {e}")
             print("Some analyses may be incomplete...")
         
+        # Unfiltered runs reuse the enriched data cached by an earlier run
+        # while sales_data.txt and the cached API products are unchanged and
+        # the products have not expired (skips the API fetch and enrichment)
+        use_cache = filter_region is None and min_amount is None and max_amount is None
+        cached_trans = (load_cache('data/sales_data.txt', PRODUCTS_CACHE_FILE, PRODUCTS_CACHE_TTL)
+                        if use_cache else None)
+        if cached_trans is not None and len(cached_trans) != valid_count:
+            cached_trans = None
+        
         # ========================================
         # STEP 6: FETCH PRODUCT DATA FROM API
         # ========================================
         print_step(6, TOTAL_STEPS, "Fetching product data from API...")
-        try:
-            api_products = fetch_all_products()
+        api_products = []
+        if cached_trans is not None:
+            print("✓ Using cached enriched data, API fetch skipped")
+        else:
+            try:
+                api_products = fetch_all_products()
+                
+                if api_products:
+                    print(f"✓ Fetched {len(api_products)} products")
+                else:
+                    print("⚠ Warning: Could not fetch API products")
+                    print("Continuing without API enrichment...")
+                    api_products = []
             
-            if api_products:
-                print(f"✓ Fetched {len(api_products)} products")
-            else:
-                print("⚠ Warning: Could not fetch API products")
+            except Exception as e:
+                print(f"⚠ Warning: API fetch error: {e}")
                 print("Continuing without API enrichment...")
                 api_products = []
         
-        except Exception as e:
-            print(f"⚠ Warning: API fetch error: {e}")
-            print("Continuing without API enrichment...")
-            api_products = []
-        
         # ========================================
         # STEP 7: ENRICH SALES DATA
         # ========================================
         print_step(7, TOTAL_STEPS, "Enriching sales data...")
         
-        if api_products:
+        if cached_trans is not None:
+            enriched_trans = cached_trans
+            enriched_count = sum(1 for t in enriched_trans if t.get('API_Match'))
+            print(f"✓ Loaded {len(enriched_trans)} enriched transactions from cache "
+                  f"({enriched_count} matched)")
+        elif api_products:
             try:
                 product_mapping = create_product_mapping(api_products)
                 enriched_trans = enrich_sales_data(valid_trans, product_mapping)
@@ -271,6 +305,13 @@ def main():
                 print(f"⚠ Warning: Enrichment error: {e}")
                 enriched_trans = valid_trans
                 print("Using non-enriched data...")
+            else:
+                # A failed cache write must not discard the enrichment
+                if use_cache:
+                    try:
+                        save_cache(enriched_trans, 'data/sales_data.txt', PRODUCTS_CACHE_FILE)
+                    except Exception as e:
+                        print(f"⚠ Warning: Could not cache enriched data: {e}")
         else:
             enriched_trans = valid_trans
             print("⚠ Skipping enrichment (no API data)")
@@ -282,6 +323,8 @@ def main():
         try:
             save_enriched_data(enriched_trans, filename='data/enriched_sales_data.txt')
             print(f"✓ Saved to: data/enriched_sales_data.txt")
+            if save_parquet:
+                save_enriched_data_parquet(enriched_trans, filename='data/enriched_sales_data.parquet')
         except Exception as e:
             print(f"⚠ Warning: Could not save enriched data: {e}")
         
@@ -291,7 +334,7 @@ def main():
         print_step(9, TOTAL_STEPS, "Generating comprehensive report...")
         try:
             success = generate_sales_report(
-                transactions=valid_trans,
+                transactions=sales_columns,
                 enriched_transactions=enriched_trans,
                 output_file='output/sales_report.txt'
             )
@@ -315,6 +358,8 @@ def main():
         print(f"  Total Revenue: ₹{total_revenue:,.2f}")
         print(f"  Files Generated:")
         print(f"    • data/enriched_sales_data.txt")
+        if save_parquet:
+            print(f"    • data/enriched_sales_data.parquet")
         print(f"    • output/sales_report.txt")
         
         print("\n✨ Success! All processes completed.")
@@ -339,4 +384,4 @@ def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    main()
+    main(save_parquet='--parquet' in sys.argv[1:])
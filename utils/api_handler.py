@@ -4,14 +4,132 @@ Handles fetching product data from DummyJSON API
 """
 
 import requests
+import pandas as pd
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import json
 import time
 import os
 import re
 
+from utils.columnar_cache import CACHE_DIR
+
+# Use orjson for parsing API responses when it is installed
+# (both parsers accept the raw response bytes, and both serializers
+# below return bytes, so JSON never goes through an extra str copy)
+try:
+    from orjson import loads as parse_json, dumps as dump_json
+except ImportError:
+    from json import loads as parse_json
+    
+    def dump_json(obj):
+        """Serializes obj to UTF-8 encoded JSON bytes"""
+        return json.dumps(obj).encode('utf-8')
+
 # API Base URL
 BASE_URL = "https://dummyjson.com/products"
 
-def fetch_all_products():
+# Numeric part of a ProductID (P101 → 101)
+_PID_RE = re.compile(r'\d+')
+
+# Product info stored per ID in the product mapping
+ProductInfo = namedtuple('ProductInfo', ['title', 'category', 'brand', 'rating'])
+
+# API fields for transactions whose product is not in the API data
+NO_API_MATCH = {'API_Category': None, 'API_Brand': None, 'API_Rating': None, 'API_Match': False}
+
+# Product fields kept from the API response
+PRODUCT_FIELDS = ('id', 'title', 'category', 'brand', 'price', 'rating')
+
+# Column order of the enriched data file
+ENRICHED_COLUMNS = [
+    'TransactionID', 'Date', 'ProductID', 'ProductName',
+    'Quantity', 'UnitPrice', 'CustomerID', 'Region',
+    'API_Category', 'API_Brand', 'API_Rating', 'API_Match'
+]
+
+# Products per request, and how many page requests may run at once
+PAGE_SIZE = 100
+MAX_PAGE_WORKERS = 5
+
+# Disk cache of fetched products, reused while younger than PRODUCTS_CACHE_TTL seconds
+PRODUCTS_CACHE_FILE = os.path.join(CACHE_DIR, 'products.json')
+PRODUCTS_CACHE_TTL = 3600
+
+# Shared HTTP session: keeps connections alive between requests and
+# retries transient failures with backoff
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+)
+_session.mount('https://', _adapter)
+_session.mount('http://', _adapter)
+_session.headers.update({'Accept': 'application/json', 'User-Agent': 'sales-analytics/1.0'})
+
+
+def print_banner(title):
+    """Prints a section banner (title between two rules) with a single write"""
+    print("\n" + "="*60 + "\n" + title + "\n" + "="*60)
+
+
+def format_products(products):
+    """
+    Keeps only the fields used by the pipeline from raw API products
+    Returns: list of product dictionaries (see fetch_all_products)
+    """
+    return [{field: product.get(field) for field in PRODUCT_FIELDS} for product in products]
+
+
+def fetch_product_page(skip, limit=PAGE_SIZE):
+    """
+    Fetches one page of products from DummyJSON API
+    Returns: list of formatted product dictionaries
+    Raises requests exceptions on failure
+    
+    The raw page is formatted as soon as it is parsed, so the full
+    API payload is never kept around for more than one page.
+    """
+    response = _session.get(BASE_URL, params={'limit': limit, 'skip': skip}, timeout=10)
+    response.raise_for_status()
+    return format_products(parse_json(response.content).get('products', []))
+
+
+def load_cached_products(cache_file=PRODUCTS_CACHE_FILE, ttl=PRODUCTS_CACHE_TTL):
+    """
+    Loads products saved by save_cached_products()
+    Returns: list of product dictionaries, or None if the cache file is
+             missing, older than ttl seconds or unreadable
+    """
+    try:
+        age = time.time() - os.path.getmtime(cache_file)
+        if age > ttl:
+            return None
+        with open(cache_file, 'rb') as file:
+            return parse_json(file.read())
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_products(products, cache_file=PRODUCTS_CACHE_FILE):
+    """
+    Saves fetched products to the cache file
+    Writes to a temporary file first so readers never see a partial file
+    """
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        temp_file = cache_file + '.tmp'
+        with open(temp_file, 'wb') as file:
+            file.write(dump_json(products))
+        os.replace(temp_file, cache_file)
+    except OSError as e:
+        print(f"⚠ Warning: Could not cache products: {e}")
+
+
+def fetch_all_products(force_refresh=False):
     """
     Fetches all products from DummyJSON API
     Returns: list of product dictionaries
@@ -30,50 +148,69 @@ def fetch_all_products():
     ]
     
     Requirements:
-    - Fetch all available products (use limit=100)
+    - Fetch all available products (pages of limit=100; pages after
+      the first are requested concurrently)
+    - Reuse products cached on disk in the last PRODUCTS_CACHE_TTL
+      seconds unless force_refresh is True
     - Handle connection errors with try-except
     - Return empty list if API fails
     - Print status message (success/failure)
     """
     
-    print("\n" + "="*60)
-    print("FETCHING PRODUCTS FROM API")
-    print("="*60)
+    print_banner("FETCHING PRODUCTS FROM API")
+    
+    # Use the cached copy if it is recent enough
+    if not force_refresh:
+        cached_products = load_cached_products()
+        if cached_products:
+            print(f"✓ SUCCESS: Loaded {len(cached_products)} products from cache ({PRODUCTS_CACHE_FILE})")
+            print("="*60)
+            return cached_products
     
     try:
         # Construct URL with limit parameter
-        url = f"{BASE_URL}?limit=100"
+        url = f"{BASE_URL}?limit={PAGE_SIZE}"
         
         print(f"Requesting: {url}")
         
         # Make GET request
-        response = requests.get(url, timeout=10)
+        response = _session.get(url, timeout=10)
         
         # Check if request was successful
         response.raise_for_status()
         
         # Parse JSON response
-        data = response.json()
-        
-        # Extract products list
-        products = data.get('products', [])
+        data = parse_json(response.content)
         
         # Format products to include only required fields
-        formatted_products = []
-        for product in products:
-            formatted_product = {
-                'id': product.get('id'),
-                'title': product.get('title'),
-                'category': product.get('category'),
-                'brand': product.get('brand'),
-                'price': product.get('price'),
-                'rating': product.get('rating')
-            }
-            formatted_products.append(formatted_product)
+        # (the raw first page is released before the other pages are fetched)
+        formatted_products = format_products(data.get('products', []))
+        total = data.get('total', 0)
+        del data
+        
+        # Fetch remaining pages (if any) concurrently; a page that fails is
+        # skipped so the products from the other pages are still used
+        remaining_skips = range(len(formatted_products), total, PAGE_SIZE) if formatted_products else []
+        failed_pages = 0
+        if remaining_skips:
+            print(f"Fetching {len(remaining_skips)} more page(s)...")
+            workers = min(len(remaining_skips), MAX_PAGE_WORKERS)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(fetch_product_page, skip) for skip in remaining_skips]
+                for skip, future in zip(remaining_skips, futures):
+                    try:
+                        formatted_products.extend(future.result())
+                    except (requests.exceptions.RequestException, ValueError) as e:
+                        failed_pages += 1
+                        print(f"⚠ WARNING: Page at skip={skip} failed ({e})")
         
         print(f"✓ SUCCESS: Fetched {len(formatted_products)} products")
         print("="*60)
         
+        # Only a complete product list is cached
+        if formatted_products and not failed_pages:
+            save_cached_products(formatted_products)
+        
         return formatted_products
         
     except requests.exceptions.ConnectionError:
@@ -105,12 +242,12 @@ def create_product_mapping(api_products):
     """
     Creates a mapping of product IDs to product info
     Parameters: api_products from fetch_all_products()
-    Returns: dictionary mapping product IDs to info
+    Returns: dictionary mapping product IDs to ProductInfo tuples
     
     Expected Output Format:
     {
-        1: {'title': 'iPhone 9', 'category': 'smartphones', 'brand': 'Apple', 'rating': 4.69},
-        2: {'title': 'iPhone X', 'category': 'smartphones', 'brand': 'Apple', 'rating': 4.44},
+        1: ProductInfo(title='iPhone 9', category='smartphones', brand='Apple', rating=4.69),
+        2: ProductInfo(title='iPhone X', category='smartphones', brand='Apple', rating=4.44),
         ...
     }
     """
@@ -125,17 +262,32 @@ def create_product_mapping(api_products):
         product_id = product.get('id')
         
         if product_id is not None:
-            product_mapping[product_id] = {
-                'title': product.get('title'),
-                'category': product.get('category'),
-                'brand': product.get('brand'),
-                'rating': product.get('rating')
-            }
+            product_mapping[product_id] = ProductInfo(
+                product.get('title'),
+                product.get('category'),
+                product.get('brand'),
+                product.get('rating')
+            )
     
     print(f"✓ Created mapping for {len(product_mapping)} products")
     return product_mapping
 
 
+def extract_product_number(product_id):
+    """
+    Extracts the numeric ID from a ProductID (P101 → 101, P5 → 5)
+    Returns: int, or None if the ProductID contains no digits
+    """
+    # Fast path: optional one-character prefix followed only by digits
+    digits = product_id[1:] if product_id and not product_id[0].isdecimal() else product_id
+    if digits.isdecimal():
+        return int(digits)
+    
+    # Slow path: first run of digits anywhere in the ID
+    numeric_match = _PID_RE.search(product_id)
+    return int(numeric_match.group()) if numeric_match else None
+
+
 def enrich_sales_data(transactions, product_mapping):
     """
     Enriches transaction data with API product information
@@ -180,80 +332,90 @@ def enrich_sales_data(transactions, product_mapping):
     if not product_mapping:
         print("⚠ Warning: No product mapping available")
     
-    print("\n" + "="*60)
-    print("ENRICHING SALES DATA WITH API INFORMATION")
-    print("="*60)
+    print_banner("ENRICHING SALES DATA WITH API INFORMATION")
+    
+    # Without a mapping nothing can match: skip the per-row lookups
+    if not product_mapping:
+        enriched_transactions = [{**trans, **NO_API_MATCH} for trans in transactions]
+        print_enrichment_summary(len(transactions), 0, len(transactions))
+        return enriched_transactions
     
     enriched_transactions = []
     match_count = 0
     no_match_count = 0
     
+    # API fields per ProductID: each distinct ID is parsed and looked up
+    # once, then reused for every transaction of that product
+    api_fields_by_id = {}
+    
+    # Bound methods used on every iteration, looked up once
+    cached_fields = api_fields_by_id.get
+    mapping_get = product_mapping.get
+    append = enriched_transactions.append
+    
     for trans in transactions:
-        # Create enriched transaction with all original fields
-        enriched_trans = trans.copy()
-        
         try:
-            # Extract numeric ID from ProductID (e.g., P101 → 101, P5 → 5)
             product_id_str = trans.get('ProductID', '')
+            api_fields = cached_fields(product_id_str)
             
-            # Remove non-numeric characters to get ID
-            numeric_match = re.search(r'\d+', product_id_str)
-            
-            if numeric_match:
-                numeric_id = int(numeric_match.group())
+            if api_fields is None:
+                # Extract numeric ID from ProductID (e.g., P101 → 101, P5 → 5)
+                numeric_id = extract_product_number(product_id_str)
                 
                 # Check if this ID exists in product mapping
-                if numeric_id in product_mapping:
-                    product_info = product_mapping[numeric_id]
-                    
-                    # Add API fields
-                    enriched_trans['API_Category'] = product_info.get('category')
-                    enriched_trans['API_Brand'] = product_info.get('brand')
-                    enriched_trans['API_Rating'] = product_info.get('rating')
-                    enriched_trans['API_Match'] = True
-                    
-                    match_count += 1
+                product_info = mapping_get(numeric_id) if numeric_id is not None else None
+                if product_info is not None:
+                    _, category, brand, rating = product_info
+                    api_fields = {
+                        'API_Category': category,
+                        'API_Brand': brand,
+                        'API_Rating': rating,
+                        'API_Match': True
+                    }
                 else:
-                    # No match found
-                    enriched_trans['API_Category'] = None
-                    enriched_trans['API_Brand'] = None
-                    enriched_trans['API_Rating'] = None
-                    enriched_trans['API_Match'] = False
-                    
-                    no_match_count += 1
-            else:
-                # Could not extract numeric ID
-                enriched_trans['API_Category'] = None
-                enriched_trans['API_Brand'] = None
-                enriched_trans['API_Rating'] = None
-                enriched_trans['API_Match'] = False
+                    # No numeric ID or no match found
+                    api_fields = NO_API_MATCH
                 
-                no_match_count += 1
+                api_fields_by_id[product_id_str] = api_fields
         
         except Exception as e:
             # Handle any errors gracefully
             print(f"⚠ Error enriching transaction {trans.get('TransactionID', 'Unknown')}: {e}")
-            
-            enriched_trans['API_Category'] = None
-            enriched_trans['API_Brand'] = None
-            enriched_trans['API_Rating'] = None
-            enriched_trans['API_Match'] = False
-            
-            no_match_count += 1
+            api_fields = NO_API_MATCH
+        
+        # Enriched transaction: all original fields plus the API fields,
+        # built as one new dict (the input transaction is left untouched)
+        append({**trans, **api_fields})
         
-        enriched_transactions.append(enriched_trans)
+        if api_fields['API_Match']:
+            match_count += 1
+        else:
+            no_match_count += 1
     
     # Print enrichment summary
-    print(f"\nEnrichment Summary:")
-    print(f"  Total transactions:     {len(transactions)}")
-    print(f"  Successfully matched:   {match_count}")
-    print(f"  No match found:         {no_match_count}")
-    print(f"  Match rate:             {(match_count/len(transactions)*100):.1f}%")
-    print("="*60)
+    print_enrichment_summary(len(transactions), match_count, no_match_count)
     
     return enriched_transactions
 
 
+def print_enrichment_summary(total, match_count, no_match_count):
+    """Prints the match statistics of enrich_sales_data()"""
+    print(f"\nEnrichment Summary:\n"
+          f"  Total transactions:     {total}\n"
+          f"  Successfully matched:   {match_count}\n"
+          f"  No match found:         {no_match_count}\n"
+          f"  Match rate:             {(match_count/total*100):.1f}%\n"
+          + "="*60)
+
+
+def format_column(values):
+    """
+    Formats all values of one column for the enriched data file
+    None becomes an empty field, anything else its str() (so 0 stays 0)
+    """
+    return ['' if value is None else str(value) for value in values]
+
+
 def save_enriched_data(enriched_transactions, filename='data/enriched_sales_data.txt'):
     """
     Saves enriched transactions back to file
@@ -266,55 +428,37 @@ def save_enriched_data(enriched_transactions, filename='data/enriched_sales_data
     - Create output file with all original + new fields
     - Use pipe delimiter
     - Handle None values appropriately
+    
+    enriched_transactions may also be a DataFrame with these columns, in
+    which case it is written by pandas' C CSV writer.
     """
     
-    if not enriched_transactions:
+    if len(enriched_transactions) == 0:
         print("⚠ Warning: No enriched transactions to save")
         return
     
-    print("\n" + "="*60)
-    print("SAVING ENRICHED DATA")
-    print("="*60)
+    print_banner("SAVING ENRICHED DATA")
     
     try:
         # Create data directory if it doesn't exist
         os.makedirs('data', exist_ok=True)
         
-        # Define column order
-        columns = [
-            'TransactionID', 'Date', 'ProductID', 'ProductName',
-            'Quantity', 'UnitPrice', 'CustomerID', 'Region',
-            'API_Category', 'API_Brand', 'API_Rating', 'API_Match'
-        ]
-        
-        # Open file for writing
-        with open(filename, 'w', encoding='utf-8') as file:
-            # Write header
-            header = '|'.join(columns)
-            file.write(header + '\n')
+        # DataFrames are serialized column-wise by pandas (missing values as '')
+        if isinstance(enriched_transactions, pd.DataFrame):
+            enriched_transactions.reindex(columns=ENRICHED_COLUMNS).to_csv(
+                filename, sep='|', index=False, na_rep='', lineterminator='\n')
+        else:
+            # Format column by column, then stitch the rows together
+            formatted_columns = [
+                format_column([trans.get(col) for trans in enriched_transactions])
+                for col in ENRICHED_COLUMNS
+            ]
+            rows = map('|'.join, zip(*formatted_columns))
             
-            # Write each transaction
-            for trans in enriched_transactions:
-                row_values = []
-                
-                for col in columns:
-                    value = trans.get(col)
-                    
-                    # Handle None values
-                    if value is None:
-                        row_values.append('')
-                    # Handle boolean values
-                    elif isinstance(value, bool):
-                        row_values.append(str(value))
-                    # Handle numeric values
-                    elif isinstance(value, (int, float)):
-                        row_values.append(str(value))
-                    # Handle string values
-                    else:
-                        row_values.append(str(value))
-                
-                row = '|'.join(row_values)
-                file.write(row + '\n')
+            # Write header and all rows with a single write
+            with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as file:
+                file.write('|'.join(ENRICHED_COLUMNS) + '\n')
+                file.write('\n'.join(rows) + '\n')
         
         print(f"✓ Successfully saved {len(enriched_transactions)} enriched transactions")
         print(f"✓ File location: {filename}")
@@ -323,3 +467,55 @@ def save_enriched_data(enriched_transactions, filename='data/enriched_sales_data
     except Exception as e:
         print(f"✗ Error saving enriched data: {e}")
         print("="*60)
+
+
+def enriched_to_dataframe(enriched_transactions):
+    """
+    Converts enriched transactions to a typed DataFrame
+    Returns: DataFrame with ENRICHED_COLUMNS (missing API values as NaN/None)
+    
+    Only API_Rating (0-5, one decimal) is downcast to float32; Quantity
+    stays int64 so large quantities cannot wrap around, and UnitPrice
+    stays float64 so prices keep every cent.
+    """
+    df = pd.DataFrame.from_records(enriched_transactions, columns=ENRICHED_COLUMNS)
+    return df.astype({'Quantity': 'int64', 'UnitPrice': 'float64',
+                      'API_Rating': 'float32', 'API_Match': 'bool'})
+
+
+def save_enriched_data_parquet(enriched_transactions, filename='data/enriched_sales_data.parquet'):
+    """
+    Saves enriched transactions as a Parquet file
+    
+    Unlike the pipe-delimited text file, Parquet keeps the column types
+    (numbers, booleans, missing values), so readers do not have to parse
+    strings again: pd.read_parquet(filename)
+    
+    Requirements:
+    - Requires pyarrow or fastparquet (save_enriched_data remains the text format)
+    """
+    
+    if len(enriched_transactions) == 0:
+        print("⚠ Warning: No enriched transactions to save")
+        return
+    
+    print_banner("SAVING ENRICHED DATA (PARQUET)")
+    
+    try:
+        # Create output directory if it doesn't exist
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+        
+        if not isinstance(enriched_transactions, pd.DataFrame):
+            enriched_transactions = enriched_to_dataframe(enriched_transactions)
+        enriched_transactions.to_parquet(filename, index=False)
+        
+        print(f"✓ Successfully saved {len(enriched_transactions)} enriched transactions")
+        print(f"✓ File location: {filename}")
+        print("="*60)
+        
+    except ImportError:
+        print("✗ Error: Parquet output requires pyarrow or fastparquet")
+        print("="*60)
+    except Exception as e:
+        print(f"✗ Error saving enriched data: {e}")
+        print("="*60)
@@ -0,0 +1,120 @@
+"""
+Columnar Cache Module
+Parquet caches shared by the pipeline: the cleaned data of data_cleaning.py
+and the enriched transactions, so later runs can skip the work (and the API)
+"""
+
+import hashlib
+import os
+import time
+import pandas as pd
+
+# One directory for every cache file (cleaned data, enriched data, products)
+CACHE_DIR = 'data/.cache'
+
+# Parquet copy of the enriched transactions from the last unfiltered run
+ENRICHED_CACHE_FILE = os.path.join(CACHE_DIR, 'enriched_sales.parquet')
+
+
+def get_cache_path(source_file):
+    """Returns the Parquet cache file used for a given source file (named after its absolute path)"""
+    key = hashlib.sha1(os.path.abspath(source_file).encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, key + '.parquet')
+
+
+def file_signature(filename):
+    """Returns: dictionary identifying the current version of a file (absolute path, size, mtime_ns)"""
+    stat = os.stat(filename)
+    return {'path': os.path.abspath(filename), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def save_frame(df, path, metadata):
+    """
+    Saves a DataFrame to a Parquet cache file
+    Returns: True if the cache was written, False if no Parquet engine
+             is installed (pyarrow or fastparquet)
+    
+    metadata (JSON-compatible) is stored in the Parquet file itself as
+    DataFrame.attrs, so the data and what it was made from never get
+    out of step. Writes to a temporary file first so an interrupted
+    write never leaves a partial cache file behind.
+    """
+    cached = df.copy(deep=False)
+    cached.attrs = metadata
+    temp_file = path + '.tmp'
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        cached.to_parquet(temp_file, index=False)
+        os.replace(temp_file, path)
+        return True
+    except ImportError:
+        return False
+    finally:
+        if os.path.isfile(temp_file):
+            os.remove(temp_file)
+
+
+def load_frame(path):
+    """
+    Loads a Parquet cache file written by save_frame()
+    Returns: tuple (DataFrame, metadata), or None if there is no cache,
+             it cannot be read (truncated or corrupt file) or no Parquet
+             engine is installed
+    """
+    try:
+        df = pd.read_parquet(path)
+    except Exception:
+        # Any failure to read the cache is treated as a cache miss
+        return None
+    
+    metadata = df.attrs
+    df.attrs = {}
+    return df, metadata
+
+
+def save_cache(enriched_transactions, source_file, products_file, path=ENRICHED_CACHE_FILE):
+    """
+    Saves enriched transactions to the Parquet cache
+    Parameters:
+    - source_file: sales data file the transactions were read from
+    - products_file: products cache the enrichment used
+    Returns: True if the cache was written, False if products_file does
+             not exist or no Parquet engine is installed
+    
+    Parquet stores one typed column per field: text columns are
+    dictionary-encoded and API_Match is kept as a boolean column.
+    """
+    try:
+        sources = [file_signature(source_file), file_signature(products_file)]
+    except OSError:
+        return False
+    
+    df = pd.DataFrame.from_records(enriched_transactions)
+    return save_frame(df, path, {'sources': sources})
+
+
+def load_cache(source_file, products_file, ttl, path=ENRICHED_CACHE_FILE):
+    """
+    Loads enriched transactions from the Parquet cache
+    Returns: list of transaction dictionaries, or None if there is no
+             cache, source_file or products_file changed since it was
+             saved, products_file is older than ttl seconds (the products
+             would be fetched again), or no Parquet engine is installed
+    
+    Values come back as plain Python types with missing API fields as
+    None, exactly as enrich_sales_data() produces them.
+    """
+    try:
+        sources = [file_signature(source_file), file_signature(products_file)]
+    except OSError:
+        return None
+    if time.time() - sources[1]['mtime_ns'] / 1e9 > ttl:
+        return None
+    
+    cached = load_frame(path)
+    if cached is None or cached[1].get('sources') != sources:
+        return None
+    
+    df = cached[0]
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict('records')
@@ -3,7 +3,186 @@ Data Processor Module
 Handles analytical processing of sales transaction data
 """
 
-from collections import defaultdict
+from collections import namedtuple
+from functools import cached_property
+import numpy as np
+
+# Per-date totals in chronological order (one array element per date);
+# revenue is already rounded to 2 decimals
+DailyAggregates = namedtuple('DailyAggregates',
+                             ['dates', 'revenue', 'transaction_count', 'unique_customers'])
+
+# Every metric of the sales report, as returned by compute_all_aggregates()
+AggregateBundle = namedtuple('AggregateBundle',
+                             ['total_revenue', 'region_stats', 'top_products', 'customer_stats',
+                              'daily_trend', 'peak_day', 'low_products'])
+
+
+class SalesColumns:
+    """
+    Column-oriented copy of a list of transactions (one array per field)
+    
+    The analytics functions below only need a handful of fields, and
+    reading them column by column avoids several dictionary lookups per
+    transaction in every function. Build it once with
+    SalesColumns(transactions) and pass it to any analytics function in
+    place of the transaction list.
+    
+    Columns:
+    - quantity:   int64 array (Quantity, 0 if missing or None); float64
+                  if any Quantity is fractional, so it is never truncated
+    - unit_price: float64 array (UnitPrice, 0.0 if missing or None)
+    
+    Text fields are dictionary-encoded: an int64 code per transaction
+    plus the distinct values in order of first appearance, so grouping
+    works on small integers and each string is hashed only once.
+    - region_codes / regions     (Region, default 'Unknown')
+    - product_codes / products   (ProductName, default 'Unknown')
+    - customer_codes / customers (CustomerID, default 'Unknown')
+    - date_codes / dates         (raw Date, None if missing)
+    """
+    
+    def __init__(self, transactions):
+        count = len(transactions)
+        # Missing or empty (None) numbers are filled here, once, so every
+        # analytic can use quantity * unit_price without further checks
+        quantity = np.fromiter((t.get('Quantity', 0) or 0 for t in transactions),
+                               dtype=np.float64, count=count)
+        whole_quantity = quantity.astype(np.int64)
+        self.quantity = whole_quantity if (whole_quantity == quantity).all() else quantity
+        self.unit_price = np.fromiter((t.get('UnitPrice', 0.0) or 0.0 for t in transactions),
+                                      dtype=np.float64, count=count)
+        self.region_codes, self.regions = _encode(
+            (t.get('Region', 'Unknown') for t in transactions), count)
+        self.product_codes, self.products = _encode(
+            (t.get('ProductName', 'Unknown') for t in transactions), count)
+        self.customer_codes, self.customers = _encode(
+            (t.get('CustomerID', 'Unknown') for t in transactions), count)
+        self.date_codes, self.dates = _encode((t.get('Date') for t in transactions), count)
+    
+    def __len__(self):
+        return len(self.quantity)
+    
+    @cached_property
+    def total_revenue(self):
+        """Sum of Quantity * UnitPrice (unrounded), as one dot product"""
+        return float(self.quantity @ self.unit_price)
+    
+    @cached_property
+    def sales(self):
+        """Quantity * UnitPrice per transaction, computed once and shared"""
+        return self.quantity * self.unit_price
+    
+    @cached_property
+    def product_totals(self):
+        """
+        Total quantity (dtype of quantity) and revenue (float64) per
+        product, aligned with products; shared by the top/low product
+        analytics and reports
+        """
+        quantity = _group_sum_count(self.product_codes, self.quantity, len(self.products))[0]
+        revenue = _group_sum_count(self.product_codes, self.sales, len(self.products))[0]
+        return quantity.astype(self.quantity.dtype), revenue
+    
+    @cached_property
+    def daily(self):
+        """Per-date aggregates (DailyAggregates), computed on first use"""
+        return _daily_aggregates(self)
+
+
+def _to_columns(transactions):
+    """
+    Returns transactions as SalesColumns
+    
+    A transaction list is converted on every call; callers that run
+    several analytics on the same data (as main.py does) build
+    SalesColumns once and pass it instead.
+    """
+    if isinstance(transactions, SalesColumns):
+        return transactions
+    return SalesColumns(transactions)
+
+
+def _encode(values, count):
+    """
+    Dictionary-encodes a column of values
+    Parameters: values (iterable of hashable values), count (number of values)
+    Returns: tuple (codes, categories) - int64 array with the index of each
+             value in categories, and object array of the distinct values
+             in order of first appearance
+    
+    First-appearance order means stable sorts of per-group results break
+    ties exactly like the original dictionary-based loops.
+    """
+    index = {}
+    codes = np.fromiter((index.setdefault(value, len(index)) for value in values),
+                        dtype=np.int64, count=count)
+    categories = np.empty(len(index), dtype=object)
+    categories[:] = list(index)
+    return codes, categories
+
+
+def _group_sum_count(codes, values, ngroups):
+    """
+    Sums values per group and counts the rows of each group
+    Parameters: codes (group index of every row), values (numeric array
+                aligned with codes), ngroups (number of groups)
+    Returns: tuple (sums, counts) of arrays with one element per group
+    
+    The one group-by kernel behind every aggregation in this module.
+    np.bincount adds the values in row order, so sums are identical to
+    accumulating them in a Python loop.
+    """
+    sums = np.bincount(codes, weights=values, minlength=ngroups)
+    counts = np.bincount(codes, minlength=ngroups)
+    return sums, counts
+
+
+def _round2(values):
+    """
+    Rounds an array of totals to 2 decimals, once per element
+    Returns: float64 array
+    
+    Uses Python's round() rather than np.round(): np.round scales by 100
+    first and can land on the other side of a tie (83.325 -> 83.32), which
+    would change reported totals and their order.
+    """
+    return np.array([round(value, 2) for value in values.tolist()], dtype=np.float64)
+
+
+def _daily_aggregates(columns):
+    """
+    Aggregates revenue, transaction count and unique customers per date
+    Returns: DailyAggregates with dates in chronological order
+    
+    Shared by daily_sales_trend(), find_peak_sales_day() and the reports
+    through SalesColumns.daily, so the grouping is done only once.
+    """
+    # Missing dates are grouped as 'Unknown'; relabel the distinct dates only
+    # and sort them (chronologically for ISO dates) with np.unique
+    labels = np.empty(len(columns.dates), dtype=object)
+    labels[:] = ['Unknown' if date is None else date for date in columns.dates.tolist()]
+    unique_dates, label_codes = np.unique(labels, return_inverse=True)
+    codes = label_codes[columns.date_codes]
+    revenue, transaction_count = _group_sum_count(codes, columns.sales, len(unique_dates))
+    
+    # Distinct customers per date: sort the (date, customer) pairs, flag the
+    # first row of every distinct pair and count the flags per date
+    customer_codes = columns.customer_codes
+    order = np.lexsort((customer_codes, codes))
+    date_sorted = codes[order]
+    customer_sorted = customer_codes[order]
+    new_pair = np.ones(len(order), dtype=bool)
+    new_pair[1:] = (date_sorted[1:] != date_sorted[:-1]) | (customer_sorted[1:] != customer_sorted[:-1])
+    unique_customers = np.bincount(date_sorted[new_pair], minlength=len(unique_dates))
+    
+    return DailyAggregates(
+        dates=unique_dates,
+        revenue=_round2(revenue),
+        transaction_count=transaction_count,
+        unique_customers=unique_customers
+    )
+
 
 def calculate_total_revenue(transactions):
     """
@@ -16,13 +195,8 @@ def calculate_total_revenue(transactions):
     if not transactions:
         return 0.0
     
-    total = 0.0
-    for trans in transactions:
-        quantity = trans.get('Quantity', 0)
-        unit_price = trans.get('UnitPrice', 0.0)
-        total += quantity * unit_price
-    
-    return round(total, 2)
+    # Sum of Quantity * UnitPrice, computed once per set of columns
+    return round(_to_columns(transactions).total_revenue, 2)
 
 
 def region_wise_sales(transactions):
@@ -50,34 +224,37 @@ def region_wise_sales(transactions):
     if not transactions:
         return {}
     
+    columns = _to_columns(transactions)
+    
     # Calculate total revenue first (for percentages)
-    total_revenue = calculate_total_revenue(transactions)
+    total_revenue = calculate_total_revenue(columns)
     
-    # Aggregate by region
-    region_data = defaultdict(lambda: {'total_sales': 0.0, 'transaction_count': 0})
+    # Aggregate by region: group number per transaction, then one
+    # weighted bincount for the sales and one plain bincount for the counts
+    regions = columns.regions
+    region_sales, region_counts = _group_sum_count(columns.region_codes, columns.sales, len(regions))
     
-    for trans in transactions:
-        region = trans.get('Region', 'Unknown')
-        quantity = trans.get('Quantity', 0)
-        unit_price = trans.get('UnitPrice', 0.0)
-        sales = quantity * unit_price
-        
-        region_data[region]['total_sales'] += sales
-        region_data[region]['transaction_count'] += 1
+    # Calculate percentages
+    if total_revenue > 0:
+        percentages = region_sales / total_revenue * 100
+    else:
+        percentages = np.zeros(len(regions))
+    
+    # Sort by total_sales descending (stable: equal sales keep their order)
+    rounded_sales = _round2(region_sales)
+    order = np.argsort(-rounded_sales, kind='stable')
     
-    # Calculate percentages and format
+    # Format results
     result = {}
-    for region, data in region_data.items():
-        percentage = (data['total_sales'] / total_revenue * 100) if total_revenue > 0 else 0.0
+    for region, total, count, percentage in zip(regions[order].tolist(), rounded_sales[order].tolist(),
+                                                region_counts[order].tolist(),
+                                                _round2(percentages[order]).tolist()):
         result[region] = {
-            'total_sales': round(data['total_sales'], 2),
-            'transaction_count': data['transaction_count'],
-            'percentage': round(percentage, 2)
+            'total_sales': total,
+            'transaction_count': count,
+            'percentage': percentage
         }
     
-    # Sort by total_sales descending
-    result = dict(sorted(result.items(), key=lambda x: x[1]['total_sales'], reverse=True))
-    
     return result
 
 
@@ -103,35 +280,35 @@ def top_selling_products(transactions, n=5):
     if not transactions:
         return []
     
-    # Aggregate by product name
-    product_data = defaultdict(lambda: {'quantity': 0, 'revenue': 0.0})
+    columns = _to_columns(transactions)
     
-    for trans in transactions:
-        product_name = trans.get('ProductName', 'Unknown')
-        quantity = trans.get('Quantity', 0)
-        unit_price = trans.get('UnitPrice', 0.0)
-        revenue = quantity * unit_price
-        
-        product_data[product_name]['quantity'] += quantity
-        product_data[product_name]['revenue'] += revenue
+    # Aggregate by product name
+    products = columns.products
+    product_quantity, product_revenue = columns.product_totals
+    
+    # Select the top n by quantity without sorting every product: partition
+    # around the n-th largest quantity, then sort only the products that
+    # reach it (ties stay in order of first appearance, as before)
+    if 0 < n < len(products):
+        nth_largest = np.partition(product_quantity, len(products) - n)[len(products) - n]
+        candidates = np.flatnonzero(product_quantity >= nth_largest)
+    else:
+        candidates = np.arange(len(products))
+    top = candidates[np.argsort(-product_quantity[candidates], kind='stable')][:n]
     
     # Convert to list of tuples
-    product_list = [
-        (product, data['quantity'], round(data['revenue'], 2))
-        for product, data in product_data.items()
+    return [
+        (product, quantity, revenue)
+        for product, quantity, revenue in zip(products[top].tolist(), product_quantity[top].tolist(),
+                                              _round2(product_revenue[top]).tolist())
     ]
-    
-    # Sort by quantity descending
-    product_list.sort(key=lambda x: x[1], reverse=True)
-    
-    # Return top n
-    return product_list[:n]
 
 
-def customer_analysis(transactions):
+def customer_analysis(transactions, top_k=None):
     """
     Analyzes customer purchase patterns
-    Returns: dictionary of customer statistics
+    Returns: dictionary of customer statistics (only the top_k biggest
+             spenders if top_k is given)
     
     Expected Output Format:
     {
@@ -151,44 +328,57 @@ def customer_analysis(transactions):
     - Calculate average order value
     - List unique products bought
     - Sort by total_spent descending
+    - top_k must not be negative (ValueError)
     """
-    if not transactions:
+    if top_k is not None and top_k < 0:
+        raise ValueError(f"top_k must be non-negative, got {top_k}")
+    
+    if not transactions or top_k == 0:
         return {}
     
-    # Aggregate by customer
-    customer_data = defaultdict(lambda: {
-        'total_spent': 0.0,
-        'purchase_count': 0,
-        'products': set()
-    })
+    columns = _to_columns(transactions)
     
-    for trans in transactions:
-        customer_id = trans.get('CustomerID', 'Unknown')
-        quantity = trans.get('Quantity', 0)
-        unit_price = trans.get('UnitPrice', 0.0)
-        product_name = trans.get('ProductName', 'Unknown')
-        
-        amount_spent = quantity * unit_price
-        
-        customer_data[customer_id]['total_spent'] += amount_spent
-        customer_data[customer_id]['purchase_count'] += 1
-        customer_data[customer_id]['products'].add(product_name)
+    # Aggregate by customer
+    customers = columns.customers
+    total_spent, purchase_count = _group_sum_count(columns.customer_codes, columns.sales,
+                                                   len(customers))
+    avg_order = total_spent / purchase_count
+    
+    # Unique products per customer, each list sorted by name: number the
+    # products in name order, then take the distinct (customer, product)
+    # pairs - np.unique returns them grouped by customer and sorted by name
+    products = columns.products
+    name_order = np.argsort(products)
+    name_rank = np.empty(len(products), dtype=np.int64)
+    name_rank[name_order] = np.arange(len(products))
+    pairs = np.unique(columns.customer_codes * len(products) + name_rank[columns.product_codes])
+    pair_customers = pairs // len(products)
+    pair_products = products[name_order][pairs % len(products)]
+    products_bought = np.split(pair_products, np.flatnonzero(np.diff(pair_customers)) + 1)
+    
+    # Sort by total_spent descending (stable: equal totals keep their order).
+    # With top_k, only the customers reaching the k-th largest total are sorted
+    rounded_spent = _round2(total_spent)
+    if top_k is not None and top_k < len(customers):
+        kth_largest = np.partition(rounded_spent, len(customers) - top_k)[len(customers) - top_k]
+        candidates = np.flatnonzero(rounded_spent >= kth_largest)
+    else:
+        candidates = np.arange(len(customers))
+    order = candidates[np.argsort(-rounded_spent[candidates], kind='stable')][:top_k]
     
     # Format results
     result = {}
-    for customer_id, data in customer_data.items():
-        avg_order = data['total_spent'] / data['purchase_count'] if data['purchase_count'] > 0 else 0.0
-        
+    for i, customer_id, total, count, avg in zip(order.tolist(), customers[order].tolist(),
+                                                 rounded_spent[order].tolist(),
+                                                 purchase_count[order].tolist(),
+                                                 _round2(avg_order[order]).tolist()):
         result[customer_id] = {
-            'total_spent': round(data['total_spent'], 2),
-            'purchase_count': data['purchase_count'],
-            'avg_order_value': round(avg_order, 2),
-            'products_bought': sorted(list(data['products']))  # Convert set to sorted list
+            'total_spent': total,
+            'purchase_count': count,
+            'avg_order_value': avg,
+            'products_bought': products_bought[i].tolist()
         }
     
-    # Sort by total_spent descending
-    result = dict(sorted(result.items(), key=lambda x: x[1]['total_spent'], reverse=True))
-    
     return result
 
 def daily_sales_trend(transactions):
@@ -217,37 +407,19 @@ def daily_sales_trend(transactions):
     if not transactions:
         return {}
     
-    # Aggregate by date
-    daily_data = defaultdict(lambda: {
-        'revenue': 0.0,
-        'transaction_count': 0,
-        'customers': set()
-    })
-    
-    for trans in transactions:
-        date = trans.get('Date', 'Unknown')
-        quantity = trans.get('Quantity', 0)
-        unit_price = trans.get('UnitPrice', 0.0)
-        customer_id = trans.get('CustomerID', 'Unknown')
-        
-        revenue = quantity * unit_price
-        
-        daily_data[date]['revenue'] += revenue
-        daily_data[date]['transaction_count'] += 1
-        daily_data[date]['customers'].add(customer_id)
+    daily = _to_columns(transactions).daily
     
-    # Format results
+    # Format results (already in chronological order)
     result = {}
-    for date, data in daily_data.items():
+    for date, revenue, count, customers in zip(daily.dates.tolist(), daily.revenue.tolist(),
+                                               daily.transaction_count.tolist(),
+                                               daily.unique_customers.tolist()):
         result[date] = {
-            'revenue': round(data['revenue'], 2),
-            'transaction_count': data['transaction_count'],
-            'unique_customers': len(data['customers'])
+            'revenue': revenue,
+            'transaction_count': count,
+            'unique_customers': customers
         }
     
-    # Sort chronologically by date
-    result = dict(sorted(result.items()))
-    
     return result
 
 
@@ -262,20 +434,16 @@ def find_peak_sales_day(transactions):
     if not transactions:
         return (None, 0.0, 0)
     
-    # Get daily sales trend
-    daily_trend = daily_sales_trend(transactions)
+    # Reuse the per-date aggregates instead of building the daily trend dict
+    daily = _to_columns(transactions).daily
     
-    if not daily_trend:
+    if not len(daily.dates):
         return (None, 0.0, 0)
     
-    # Find the date with maximum revenue
-    peak_date = max(daily_trend.items(), key=lambda x: x[1]['revenue'])
+    # Find the date with maximum revenue (earliest date on ties)
+    peak = int(np.argmax(daily.revenue))
     
-    date = peak_date[0]
-    revenue = peak_date[1]['revenue']
-    transaction_count = peak_date[1]['transaction_count']
-    
-    return (date, revenue, transaction_count)
+    return (daily.dates[peak], float(daily.revenue[peak]), int(daily.transaction_count[peak]))
 
 
 def low_performing_products(transactions, threshold=10):
@@ -298,29 +466,56 @@ def low_performing_products(transactions, threshold=10):
     if not transactions:
         return []
     
+    columns = _to_columns(transactions)
+    
     # Aggregate by product name
-    product_data = defaultdict(lambda: {'quantity': 0, 'revenue': 0.0})
-    
-    for trans in transactions:
-        product_name = trans.get('ProductName', 'Unknown')
-        quantity = trans.get('Quantity', 0)
-        unit_price = trans.get('UnitPrice', 0.0)
-        revenue = quantity * unit_price
-        
-        product_data[product_name]['quantity'] += quantity
-        product_data[product_name]['revenue'] += revenue
-    
-    # Filter products with quantity < threshold
-    low_performers = [
-        (product, data['quantity'], round(data['revenue'], 2))
-        for product, data in product_data.items()
-        if data['quantity'] < threshold
+    products = columns.products
+    product_quantity, product_revenue = columns.product_totals
+    
+    # Filter products with quantity < threshold, sorted by quantity
+    # ascending (lowest first; equal quantities keep their order)
+    low = np.flatnonzero(product_quantity < threshold)
+    low = low[np.argsort(product_quantity[low], kind='stable')]
+    
+    return [
+        (product, quantity, revenue)
+        for product, quantity, revenue in zip(products[low].tolist(), product_quantity[low].tolist(),
+                                              _round2(product_revenue[low]).tolist())
     ]
+
+
+def compute_all_aggregates(transactions, top_n=5, top_customers=5, low_threshold=10):
+    """
+    Computes every metric used by the sales report in one go
+    Returns: AggregateBundle
     
-    # Sort by quantity ascending (lowest first)
-    low_performers.sort(key=lambda x: x[1])
+    Expected Output Format:
+    AggregateBundle(
+        total_revenue=1545000.5,
+        region_stats={...},      # region_wise_sales()
+        top_products=[...],      # top_selling_products(n=top_n)
+        customer_stats={...},    # customer_analysis(top_k=top_customers)
+        daily_trend={...},       # daily_sales_trend()
+        peak_day=(...),          # find_peak_sales_day()
+        low_products=[...]       # low_performing_products(threshold=low_threshold)
+    )
     
-    return low_performers
+    Requirements:
+    - Convert the transactions to columns only once
+    - Share the sales column, product totals and daily aggregates
+      between all metrics instead of recomputing them
+    """
+    columns = _to_columns(transactions)
+    
+    return AggregateBundle(
+        total_revenue=calculate_total_revenue(columns),
+        region_stats=region_wise_sales(columns),
+        top_products=top_selling_products(columns, n=top_n),
+        customer_stats=customer_analysis(columns, top_k=top_customers),
+        daily_trend=daily_sales_trend(columns),
+        peak_day=find_peak_sales_day(columns),
+        low_products=low_performing_products(columns, threshold=low_threshold)
+    )
 
 
 # Display helper functions
@@ -340,11 +535,14 @@ def display_daily_trend(daily_trend, show_all=False):
     else:
         display_items = items
     
-    for date, stats in display_items:
-        if date == '...':
-            print("...")
-            continue
-        print(f"{date:<15} ₹{stats['revenue']:>15,.2f}  {stats['transaction_count']:<15} {stats['unique_customers']:<12}")
+    # Build all rows first and print them at once
+    rows = [
+        "..." if date == '...' else
+        f"{date:<15} ₹{stats['revenue']:>15,.2f}  {stats['transaction_count']:<15} {stats['unique_customers']:<12}"
+        for date, stats in display_items
+    ]
+    if rows:
+        print("\n".join(rows))
     
     # Summary
     total_revenue = sum(s['revenue'] for s in daily_trend.values())
@@ -391,8 +589,8 @@ def display_low_performers(products, threshold):
         print(f"{'Product':<30} {'Quantity':<12} {'Revenue':<20}")
         print("-"*70)
         
-        for product, qty, revenue in products:
-            print(f"{product:<30} {qty:<12} ₹{revenue:>15,.2f}")
+        print("\n".join(f"{product:<30} {qty:<12} ₹{revenue:>15,.2f}"
+                        for product, qty, revenue in products))
         
         print("-"*70)
         print(f"Total low performers: {len(products)}")
@@ -408,16 +606,19 @@ def generate_trend_report(transactions):
     print(" "*25 + "SALES TREND ANALYSIS")
     print("="*80)
     
+    # Convert to columns once, shared by all analytics below
+    columns = _to_columns(transactions)
+    
     # 1. Daily Trend
-    daily_trend = daily_sales_trend(transactions)
+    daily_trend = daily_sales_trend(columns)
     display_daily_trend(daily_trend)
     
     # 2. Peak Sales Day
-    peak_day = find_peak_sales_day(transactions)
+    peak_day = find_peak_sales_day(columns)
     display_peak_day(peak_day)
     
     # 3. Low Performing Products
-    low_products_10 = low_performing_products(transactions, threshold=10)
+    low_products_10 = low_performing_products(columns, threshold=10)
     display_low_performers(low_products_10, threshold=10)
     
     # 4. Additional Insights
@@ -425,38 +626,49 @@ def generate_trend_report(transactions):
     print("TREND INSIGHTS")
     print("="*60)
     
-    # Best and worst days
+    # Best and worst days: one argmax/argmin scan over the daily revenue
+    # (earliest best day and latest worst day on ties)
     if daily_trend:
-        dates_sorted = sorted(daily_trend.items(), key=lambda x: x[1]['revenue'], reverse=True)
-        best_day = dates_sorted[0]
-        worst_day = dates_sorted[-1]
+        daily = columns.daily
+        best = int(np.argmax(daily.revenue))
+        worst = len(daily.revenue) - 1 - int(np.argmin(daily.revenue[::-1]))
+        best_revenue = float(daily.revenue[best])
+        worst_revenue = float(daily.revenue[worst])
         
-        print(f"\n📈 Best Day:   {best_day[0]} (₹{best_day[1]['revenue']:,.2f})")
-        print(f"📉 Worst Day:  {worst_day[0]} (₹{worst_day[1]['revenue']:,.2f})")
+        print(f"\n📈 Best Day:   {daily.dates[best]} (₹{best_revenue:,.2f})")
+        print(f"📉 Worst Day:  {daily.dates[worst]} (₹{worst_revenue:,.2f})")
         
         # Calculate growth/decline
-        revenue_diff = best_day[1]['revenue'] - worst_day[1]['revenue']
+        revenue_diff = best_revenue - worst_revenue
         print(f"💰 Variance:   ₹{revenue_diff:,.2f}")
     
-    # Product performance summary
-    all_products = defaultdict(lambda: {'quantity': 0})
-    for trans in transactions:
-        product = trans.get('ProductName', 'Unknown')
-        all_products[product]['quantity'] += trans.get('Quantity', 0)
+    # Product performance summary (reuses the per-product totals computed
+    # for the low performers above instead of aggregating again)
+    product_quantity, _ = columns.product_totals
     
-    high_performers = sum(1 for p in all_products.values() if p['quantity'] >= 10)
+    high_performers = int((product_quantity >= 10).sum())
     low_performers = len(low_products_10)
     
     print(f"\n📦 Products Analysis:")
     print(f"  High Performers (≥10 units): {high_performers}")
     print(f"  Low Performers (<10 units):  {low_performers}")
-    print(f"  Total Products:              {len(all_products)}")
+    print(f"  Total Products:              {len(columns.products)}")
     
     print("="*60)
 
 from datetime import datetime
+import io
 import os
 
+# Row templates of the sales report tables, bound once instead of
+# building an f-string per row
+_REGION_ROW = "{:<15} ₹{:>15,.2f}  {:>6.2f}%        {:<15}\n".format
+_PRODUCT_ROW = "{:<8} {:<35} {:<15} ₹{:>15,.2f}\n".format
+_CUSTOMER_ROW = "{:<8} {:<20} ₹{:>15,.2f}  {:<15}\n".format
+_DAILY_ROW = "{:<15} ₹{:>15,.2f}  {:<15} {:<20}\n".format
+_LOW_PRODUCT_ROW = "  {:<30} {:<12} ₹{:>12,.2f}\n".format
+
+
 def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt'):
     """
     Generates a comprehensive formatted text report
@@ -500,192 +712,187 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
     os.makedirs('output', exist_ok=True)
     
     try:
-        # Calculate all required metrics
-        total_revenue = calculate_total_revenue(transactions)
-        region_stats = region_wise_sales(transactions)
-        top_products = top_selling_products(transactions, n=5)
-        customer_stats = customer_analysis(transactions)
-        daily_trend = daily_sales_trend(transactions)
-        peak_day = find_peak_sales_day(transactions)
-        low_products = low_performing_products(transactions, threshold=10)
-        
-        # Get date range
-        dates = sorted([t['Date'] for t in transactions if t.get('Date')])
-        date_range_start = dates[0] if dates else 'N/A'
-        date_range_end = dates[-1] if dates else 'N/A'
-        
-        # Enrichment statistics
-        enriched_count = sum(1 for t in enriched_transactions if t.get('API_Match'))
+        # Calculate all required metrics (on columns built once)
+        columns = _to_columns(transactions)
+        (total_revenue, region_stats, top_products, customer_stats,
+         daily_trend, peak_day, low_products) = compute_all_aggregates(columns)
+        
+        # Get date range (min/max over the distinct dates, ISO strings sort chronologically)
+        dates = [date for date in columns.dates.tolist() if date]
+        date_range_start = min(dates) if dates else 'N/A'
+        date_range_end = max(dates) if dates else 'N/A'
+        
+        # Enrichment statistics from one boolean API_Match column
         total_enriched = len(enriched_transactions)
-        enrichment_rate = (enriched_count / total_enriched * 100) if total_enriched > 0 else 0
+        api_match = np.fromiter((bool(t.get('API_Match')) for t in enriched_transactions),
+                                dtype=bool, count=total_enriched)
+        enriched_count = int(api_match.sum())
+        enrichment_rate = float(api_match.mean()) * 100 if total_enriched > 0 else 0
         
-        # Products that couldn't be enriched
-        unenriched_products = set(
-            t['ProductName'] 
-            for t in enriched_transactions 
-            if not t.get('API_Match')
-        )
+        # Products that couldn't be enriched (only the unmatched rows are visited)
+        unenriched_products = sorted(set(
+            enriched_transactions[i]['ProductName']
+            for i in np.flatnonzero(~api_match).tolist()
+        ))
         
-        # Open file for writing
-        with open(output_file, 'w', encoding='utf-8') as f:
-            
-            # ========================================
-            # 1. HEADER
-            # ========================================
-            f.write("="*80 + "\n")
-            f.write(" "*25 + "SALES ANALYTICS REPORT\n")
-            f.write(f" "*20 + f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f" "*23 + f"Records Processed: {len(transactions)}\n")
-            f.write("="*80 + "\n\n")
-            
-            # ========================================
-            # 2. OVERALL SUMMARY
-            # ========================================
-            f.write("OVERALL SUMMARY\n")
-            f.write("-"*80 + "\n")
-            f.write(f"Total Revenue:        ₹{total_revenue:,.2f}\n")
-            f.write(f"Total Transactions:   {len(transactions)}\n")
-            
-            avg_order_value = total_revenue / len(transactions) if transactions else 0
-            f.write(f"Average Order Value:  ₹{avg_order_value:,.2f}\n")
-            f.write(f"Date Range:           {date_range_start} to {date_range_end}\n")
-            f.write("\n")
-            
-            # ========================================
-            # 3. REGION-WISE PERFORMANCE
-            # ========================================
-            f.write("REGION-WISE PERFORMANCE\n")
-            f.write("-"*80 + "\n")
-            f.write(f"{'Region':<15} {'Sales':<20} {'% of Total':<15} {'Transactions':<15}\n")
-            f.write("-"*80 + "\n")
-            
-            for region, stats in region_stats.items():
-                f.write(f"{region:<15} ₹{stats['total_sales']:>15,.2f}  "
-                       f"{stats['percentage']:>6.2f}%{' '*7} "
-                       f"{stats['transaction_count']:<15}\n")
-            
-            f.write("\n")
-            
-            # ========================================
-            # 4. TOP 5 PRODUCTS
-            # ========================================
-            f.write("TOP 5 PRODUCTS\n")
-            f.write("-"*80 + "\n")
-            f.write(f"{'Rank':<8} {'Product Name':<35} {'Quantity':<15} {'Revenue':<20}\n")
-            f.write("-"*80 + "\n")
-            
-            for rank, (product, quantity, revenue) in enumerate(top_products, 1):
-                f.write(f"{rank:<8} {product:<35} {quantity:<15} ₹{revenue:>15,.2f}\n")
-            
-            f.write("\n")
-            
-            # ========================================
-            # 5. TOP 5 CUSTOMERS
-            # ========================================
-            f.write("TOP 5 CUSTOMERS\n")
-            f.write("-"*80 + "\n")
-            f.write(f"{'Rank':<8} {'Customer ID':<20} {'Total Spent':<20} {'Order Count':<15}\n")
-            f.write("-"*80 + "\n")
-            
-            top_5_customers = list(customer_stats.items())[:5]
-            for rank, (customer_id, stats) in enumerate(top_5_customers, 1):
-                f.write(f"{rank:<8} {customer_id:<20} ₹{stats['total_spent']:>15,.2f}  "
-                       f"{stats['purchase_count']:<15}\n")
-            
-            f.write("\n")
-            
-            # ========================================
-            # 6. DAILY SALES TREND
-            # ========================================
-            f.write("DAILY SALES TREND\n")
-            f.write("-"*80 + "\n")
-            f.write(f"{'Date':<15} {'Revenue':<20} {'Transactions':<15} {'Unique Customers':<20}\n")
-            f.write("-"*80 + "\n")
-            
-            # Show first 10 and last 5 days if more than 15 days
-            daily_items = list(daily_trend.items())
-            if len(daily_items) > 15:
-                display_items = daily_items[:10] + [('...', None)] + daily_items[-5:]
-            else:
-                display_items = daily_items
-            
-            for date, stats in display_items:
-                if date == '...':
-                    f.write(f"{'...':<15} {'...':<20} {'...':<15} {'...':<20}\n")
-                else:
-                    f.write(f"{date:<15} ₹{stats['revenue']:>15,.2f}  "
-                           f"{stats['transaction_count']:<15} "
-                           f"{stats['unique_customers']:<20}\n")
-            
-            # Summary
-            total_days = len(daily_trend)
-            avg_daily_revenue = total_revenue / total_days if total_days > 0 else 0
-            f.write("-"*80 + "\n")
-            f.write(f"Total Days: {total_days}  |  Average Daily Revenue: ₹{avg_daily_revenue:,.2f}\n")
-            f.write("\n")
-            
-            # ========================================
-            # 7. PRODUCT PERFORMANCE ANALYSIS
-            # ========================================
-            f.write("PRODUCT PERFORMANCE ANALYSIS\n")
-            f.write("-"*80 + "\n")
-            
-            # Best selling day
-            peak_date, peak_revenue, peak_count = peak_day
-            f.write(f"\nBest Selling Day:\n")
-            f.write(f"  Date:         {peak_date}\n")
-            f.write(f"  Revenue:      ₹{peak_revenue:,.2f}\n")
-            f.write(f"  Transactions: {peak_count}\n")
-            
-            # Low performing products
-            f.write(f"\nLow Performing Products (Quantity < 10):\n")
-            if low_products:
-                f.write(f"  {'Product':<30} {'Quantity':<12} {'Revenue':<15}\n")
-                f.write("  " + "-"*60 + "\n")
-                for product, qty, revenue in low_products[:10]:  # Show top 10
-                    f.write(f"  {product:<30} {qty:<12} ₹{revenue:>12,.2f}\n")
-                
-                if len(low_products) > 10:
-                    f.write(f"  ... and {len(low_products) - 10} more products\n")
-            else:
-                f.write("  No low performing products found.\n")
-            
-            # Average transaction value per region
-            f.write(f"\nAverage Transaction Value by Region:\n")
-            for region, stats in region_stats.items():
-                avg_trans_value = stats['total_sales'] / stats['transaction_count'] if stats['transaction_count'] > 0 else 0
-                f.write(f"  {region:<15} ₹{avg_trans_value:,.2f}\n")
-            
-            f.write("\n")
-            
-            # ========================================
-            # 8. API ENRICHMENT SUMMARY
-            # ========================================
-            f.write("API ENRICHMENT SUMMARY\n")
-            f.write("-"*80 + "\n")
-            f.write(f"Total Products Enriched:     {enriched_count} out of {total_enriched}\n")
-            f.write(f"Success Rate:                {enrichment_rate:.2f}%\n")
-            
-            f.write(f"\nProducts That Couldn't Be Enriched ({len(unenriched_products)}):\n")
-            if unenriched_products:
-                for i, product in enumerate(sorted(unenriched_products), 1):
-                    f.write(f"  {i}. {product}\n")
-                    if i >= 20:  # Limit to first 20
-                        remaining = len(unenriched_products) - 20
-                        if remaining > 0:
-                            f.write(f"  ... and {remaining} more products\n")
-                        break
+        # Build the whole report in memory, then write it to disk at once
+        report = io.StringIO()
+        
+        # ========================================
+        # 1. HEADER
+        # ========================================
+        report.write("="*80 + "\n")
+        report.write(" "*25 + "SALES ANALYTICS REPORT\n")
+        report.write(f" "*20 + f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        report.write(f" "*23 + f"Records Processed: {len(transactions)}\n")
+        report.write("="*80 + "\n\n")
+        
+        # ========================================
+        # 2. OVERALL SUMMARY
+        # ========================================
+        report.write("OVERALL SUMMARY\n")
+        report.write("-"*80 + "\n")
+        report.write(f"Total Revenue:        ₹{total_revenue:,.2f}\n")
+        report.write(f"Total Transactions:   {len(transactions)}\n")
+        
+        avg_order_value = total_revenue / len(transactions) if transactions else 0
+        report.write(f"Average Order Value:  ₹{avg_order_value:,.2f}\n")
+        report.write(f"Date Range:           {date_range_start} to {date_range_end}\n")
+        report.write("\n")
+        
+        # ========================================
+        # 3. REGION-WISE PERFORMANCE
+        # ========================================
+        report.write("REGION-WISE PERFORMANCE\n")
+        report.write("-"*80 + "\n")
+        report.write(f"{'Region':<15} {'Sales':<20} {'% of Total':<15} {'Transactions':<15}\n")
+        report.write("-"*80 + "\n")
+        
+        report.writelines(_REGION_ROW(region, stats['total_sales'], stats['percentage'],
+                                      stats['transaction_count'])
+                          for region, stats in region_stats.items())
+        
+        report.write("\n")
+        
+        # ========================================
+        # 4. TOP 5 PRODUCTS
+        # ========================================
+        report.write("TOP 5 PRODUCTS\n")
+        report.write("-"*80 + "\n")
+        report.write(f"{'Rank':<8} {'Product Name':<35} {'Quantity':<15} {'Revenue':<20}\n")
+        report.write("-"*80 + "\n")
+        
+        report.writelines(_PRODUCT_ROW(rank, product, quantity, revenue)
+                          for rank, (product, quantity, revenue) in enumerate(top_products, 1))
+        
+        report.write("\n")
+        
+        # ========================================
+        # 5. TOP 5 CUSTOMERS
+        # ========================================
+        report.write("TOP 5 CUSTOMERS\n")
+        report.write("-"*80 + "\n")
+        report.write(f"{'Rank':<8} {'Customer ID':<20} {'Total Spent':<20} {'Order Count':<15}\n")
+        report.write("-"*80 + "\n")
+        
+        report.writelines(_CUSTOMER_ROW(rank, customer_id, stats['total_spent'], stats['purchase_count'])
+                          for rank, (customer_id, stats) in enumerate(customer_stats.items(), 1))
+        
+        report.write("\n")
+        
+        # ========================================
+        # 6. DAILY SALES TREND
+        # ========================================
+        report.write("DAILY SALES TREND\n")
+        report.write("-"*80 + "\n")
+        report.write(f"{'Date':<15} {'Revenue':<20} {'Transactions':<15} {'Unique Customers':<20}\n")
+        report.write("-"*80 + "\n")
+        
+        # Show first 10 and last 5 days if more than 15 days
+        daily_items = list(daily_trend.items())
+        if len(daily_items) > 15:
+            display_items = daily_items[:10] + [('...', None)] + daily_items[-5:]
+        else:
+            display_items = daily_items
+        
+        for date, stats in display_items:
+            if date == '...':
+                report.write(f"{'...':<15} {'...':<20} {'...':<15} {'...':<20}\n")
             else:
-                f.write("  All products successfully enriched!\n")
-            
-            f.write("\n")
+                report.write(_DAILY_ROW(date, stats['revenue'], stats['transaction_count'],
+                                        stats['unique_customers']))
+        
+        # Summary
+        total_days = len(daily_trend)
+        avg_daily_revenue = total_revenue / total_days if total_days > 0 else 0
+        report.write("-"*80 + "\n")
+        report.write(f"Total Days: {total_days}  |  Average Daily Revenue: ₹{avg_daily_revenue:,.2f}\n")
+        report.write("\n")
+        
+        # ========================================
+        # 7. PRODUCT PERFORMANCE ANALYSIS
+        # ========================================
+        report.write("PRODUCT PERFORMANCE ANALYSIS\n")
+        report.write("-"*80 + "\n")
+        
+        # Best selling day
+        peak_date, peak_revenue, peak_count = peak_day
+        report.write(f"\nBest Selling Day:\n")
+        report.write(f"  Date:         {peak_date}\n")
+        report.write(f"  Revenue:      ₹{peak_revenue:,.2f}\n")
+        report.write(f"  Transactions: {peak_count}\n")
+        
+        # Low performing products
+        report.write(f"\nLow Performing Products (Quantity < 10):\n")
+        if low_products:
+            report.write(f"  {'Product':<30} {'Quantity':<12} {'Revenue':<15}\n")
+            report.write("  " + "-"*60 + "\n")
+            # Show top 10
+            report.writelines(_LOW_PRODUCT_ROW(product, qty, revenue)
+                              for product, qty, revenue in low_products[:10])
             
-            # ========================================
-            # FOOTER
-            # ========================================
-            f.write("="*80 + "\n")
-            f.write(" "*28 + "END OF REPORT\n")
-            f.write("="*80 + "\n")
+            if len(low_products) > 10:
+                report.write(f"  ... and {len(low_products) - 10} more products\n")
+        else:
+            report.write("  No low performing products found.\n")
+        
+        # Average transaction value per region
+        report.write(f"\nAverage Transaction Value by Region:\n")
+        for region, stats in region_stats.items():
+            avg_trans_value = stats['total_sales'] / stats['transaction_count'] if stats['transaction_count'] > 0 else 0
+            report.write(f"  {region:<15} ₹{avg_trans_value:,.2f}\n")
+        
+        report.write("\n")
+        
+        # ========================================
+        # 8. API ENRICHMENT SUMMARY
+        # ========================================
+        report.write("API ENRICHMENT SUMMARY\n")
+        report.write("-"*80 + "\n")
+        report.write(f"Total Products Enriched:     {enriched_count} out of {total_enriched}\n")
+        report.write(f"Success Rate:                {enrichment_rate:.2f}%\n")
+        
+        report.write(f"\nProducts That Couldn't Be Enriched ({len(unenriched_products)}):\n")
+        if unenriched_products:
+            # Limit to first 20
+            report.writelines(f"  {i}. {product}\n"
+                              for i, product in enumerate(unenriched_products[:20], 1))
+            if len(unenriched_products) > 20:
+                report.write(f"  ... and {len(unenriched_products) - 20} more products\n")
+        else:
+            report.write("  All products successfully enriched!\n")
+        
+        report.write("\n")
+        
+        # ========================================
+        # FOOTER
+        # ========================================
+        report.write("="*80 + "\n")
+        report.write(" "*28 + "END OF REPORT\n")
+        report.write("="*80 + "\n")
+        
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(report.getvalue())
         
         print(f"✓ Report successfully generated: {output_file}")
         print(f"✓ Report size: {os.path.getsize(output_file)} bytes")
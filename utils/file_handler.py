@@ -3,6 +3,104 @@ File Handler Module
 Handles reading sales data with encoding issues
 """
 
+import codecs
+import mmap
+import os
+from functools import cached_property, lru_cache
+from itertools import compress, repeat
+from operator import itemgetter, le
+import numpy as np
+
+# Optional encoding detection (charset_normalizer is installed with requests)
+try:
+    from charset_normalizer import from_bytes as detect_charset
+except ImportError:
+    detect_charset = None
+
+# Bytes sampled from the start of a file to guess its encoding
+ENCODING_SAMPLE_SIZE = 16384
+
+# Encodings read_sales_data() tries, in order
+ENCODINGS = ('utf-8', 'latin-1', 'cp1252', 'iso-8859-1')
+
+# Fields every valid transaction must have (not empty)
+REQUIRED_FIELDS = ('TransactionID', 'Date', 'ProductID', 'ProductName',
+                   'Quantity', 'UnitPrice', 'CustomerID', 'Region')
+
+# Required fields only the blank check covers: the ID fields are covered by
+# their prefix rules and Quantity / UnitPrice by the > 0 rules, since a value
+# that passes those is never blank
+TEXT_FIELDS = ('Date', 'ProductName', 'Region')
+
+
+def map_file(filename):
+    """
+    Maps a file into memory for reading
+    Returns: read-only mmap of the file contents (bytes for empty files
+             or when the file cannot be memory-mapped)
+    
+    The operating system pages the file in on demand, so the contents are
+    not copied through a read buffer first.
+    """
+    with open(filename, 'rb') as file:
+        try:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty file (cannot be mapped) or no mmap support
+            return file.read()
+
+
+def decode_lines(data, encoding):
+    """
+    Decodes a mapped file and splits it into lines
+    Returns: list of lines (strings without line endings)
+    
+    The mapped bytes are decoded directly, without reading them into a
+    buffer first. Lines are split at '\n', '\r\n' and a lone '\r', like
+    reading the file in text mode. Decoding is strict, so invalid bytes
+    raise UnicodeDecodeError.
+    """
+    text = str(data, encoding)
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text.split('\n')
+
+
+def detect_encoding(data, encodings):
+    """
+    Guesses the encoding of a mapped file from its first bytes
+    Returns: the matching entry of encodings, or None if the sample is
+             valid UTF-8, the guess is not in encodings, or
+             charset_normalizer is not installed
+    
+    Only ENCODING_SAMPLE_SIZE bytes are inspected. A sample that is
+    valid UTF-8 is left to the normal order (UTF-8 first), so files that
+    decode as UTF-8 are never read any other way.
+    """
+    if detect_charset is None:
+        return None
+    
+    sample = bytes(data[:ENCODING_SAMPLE_SIZE])
+    try:
+        sample.decode('utf-8')
+        return None
+    except UnicodeDecodeError as e:
+        # A character cut off at the end of the sample is still valid UTF-8
+        if e.reason == 'unexpected end of data':
+            return None
+    
+    candidates = [encoding for encoding in encodings if codecs.lookup(encoding).name != 'utf-8']
+    best = detect_charset(sample, cp_isolation=candidates).best()
+    if best is None:
+        return None
+    
+    detected = codecs.lookup(best.encoding).name
+    for encoding in candidates:
+        if codecs.lookup(encoding).name == detected:
+            return encoding
+    return None
+
+
 def read_sales_data(filename):
     """
     Reads sales data from file handling encoding issues
@@ -17,38 +115,71 @@ def read_sales_data(filename):
     - Handle FileNotFoundError with appropriate error message
     - Skip the header row
     - Remove empty lines
+    
+    The lines of the most recently read file are cached and reused while
+    its modification time and size stay the same, so repeated reads in
+    one process (the test scripts) decode the file only once. Only one
+    file is kept, so memory stays bounded by the largest file read.
+    """
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Error: File '{filename}' not found. Please check the file path.")
+    except Exception as e:
+        raise ValueError(f"Error: Could not read file '{filename}': {e}")
+    
+    return list(load_sales_lines(filename, stat.st_mtime_ns, stat.st_size))
+
+
+@lru_cache(maxsize=1)
+def load_sales_lines(filename, mtime_ns, size):
+    """
+    Reads and decodes the lines of a sales data file (see read_sales_data)
+    Returns: tuple of raw lines, so cached results cannot be modified
+    
+    mtime_ns and size are only part of the cache key: a changed file gets
+    a new key and is read again.
     """
     
     # List of encodings to try in order
-    encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
+    encodings = list(ENCODINGS)
     
     lines = []
     successful_encoding = None
     
+    # The file is mapped once and every encoding decodes the same bytes
+    try:
+        data = map_file(filename)
+    except FileNotFoundError:
+        # File doesn't exist - raise error immediately
+        raise FileNotFoundError(f"Error: File '{filename}' not found. Please check the file path.")
+    except Exception as e:
+        raise ValueError(f"Error: Could not read file '{filename}': {e}")
+    
+    # Try the detected encoding first (if any), then the rest in order
+    detected = detect_encoding(data, encodings)
+    if detected:
+        encodings = [detected] + [encoding for encoding in encodings if encoding != detected]
+    
     # Try to read file with different encodings
     for encoding in encodings:
         try:
-            with open(filename, 'r', encoding=encoding, errors='strict') as file:
-                # Read all lines
-                all_lines = file.readlines()
-                
-                # Skip header (first line) and process rest
-                for line in all_lines[1:]:
-                    # Strip whitespace
-                    line = line.strip()
-                    
-                    # Skip empty lines
-                    if line:
-                        lines.append(line)
-                
-                successful_encoding = encoding
-                print(f"✓ Successfully read file using '{encoding}' encoding")
-                print(f"✓ Total lines read: {len(lines)}")
-                break  # Successfully read, exit loop
+            # Split into lines
+            all_lines = decode_lines(data, encoding)
+            
+            # Skip header (first line) and process rest
+            for line in all_lines[1:]:
+                # Strip whitespace
+                line = line.strip()
                 
-        except FileNotFoundError:
-            # File doesn't exist - raise error immediately
-            raise FileNotFoundError(f"Error: File '{filename}' not found. Please check the file path.")
+                # Skip empty lines
+                if line:
+                    lines.append(line)
+            
+            successful_encoding = encoding
+            print(f"✓ Successfully read file using '{encoding}' encoding")
+            print(f"✓ Total lines read: {len(lines)}")
+            break  # Successfully read, exit loop
         
         except UnicodeDecodeError:
             # This encoding didn't work, try next one
@@ -60,6 +191,9 @@ def read_sales_data(filename):
             print(f"✗ Unexpected error with '{encoding}' encoding: {e}")
             continue
     
+    if isinstance(data, mmap.mmap):
+        data.close()
+    
     # If no encoding worked
     if not successful_encoding:
         raise ValueError(f"Error: Could not read file '{filename}' with any supported encoding (tried: {', '.join(encodings)})")
@@ -68,7 +202,7 @@ def read_sales_data(filename):
     if not lines:
         raise ValueError(f"Error: File '{filename}' is empty or contains only header")
     
-    return lines
+    return tuple(lines)
 
 
 def validate_line_format(line):
@@ -155,7 +289,7 @@ Data Parser Module
 Handles parsing and validation of sales transaction data
 """
 
-def parse_transactions(raw_lines):
+def parse_transactions(raw_lines, verbose=False):
     """
     Parses raw lines into clean list of dictionaries
     Returns: list of dictionaries with keys:
@@ -184,10 +318,15 @@ def parse_transactions(raw_lines):
     - Convert Quantity to int
     - Convert UnitPrice to float
     - Skip rows with incorrect number of fields
+    
+    Skipped lines are collected while parsing and reported after the
+    loop: the first 10 by default, or all of them with verbose=True.
     """
     
     transactions = []
-    skipped_count = 0
+    append_transaction = transactions.append
+    skipped_rows = []
+    skip_row = skipped_rows.append
     
     print("\n" + "="*60)
     print("PARSING TRANSACTIONS")
@@ -200,67 +339,185 @@ def parse_transactions(raw_lines):
             
             # Check if we have correct number of fields (8 expected)
             if len(fields) != 8:
-                print(f"Line {line_num}: Skipped (incorrect field count: {len(fields)} fields)")
-                skipped_count += 1
+                skip_row((line_num, f"incorrect field count: {len(fields)} fields"))
                 continue
             
-            # Extract and clean fields
-            transaction_id = fields[0].strip()
-            date = fields[1].strip()
-            product_id = fields[2].strip()
-            product_name = fields[3].strip()
-            quantity_str = fields[4].strip()
-            unit_price_str = fields[5].strip()
-            customer_id = fields[6].strip()
-            region = fields[7].strip()
-            
-            # Clean ProductName: remove commas (replace with space)
-            product_name_clean = product_name.replace(',', ' ')
+            transaction_id, date, product_id, product_name, quantity_str, unit_price_str, customer_id, region = fields
             
-            # Clean numeric fields: remove commas and convert types
+            # Clean numeric fields: remove commas and convert types. int() and
+            # float() skip surrounding whitespace themselves, so the fields are
+            # only stripped when that fails (a few separator characters count
+            # as whitespace for strip() but not for the conversions)
             try:
-                quantity_clean = quantity_str.replace(',', '')
-                quantity = int(quantity_clean)
+                quantity = int(quantity_str.replace(',', ''))
             except ValueError:
-                print(f"Line {line_num}: Skipped (invalid Quantity: '{quantity_str}')")
-                skipped_count += 1
-                continue
+                quantity_str = quantity_str.strip()
+                try:
+                    quantity = int(quantity_str.replace(',', ''))
+                except ValueError:
+                    skip_row((line_num, f"invalid Quantity: '{quantity_str}'"))
+                    continue
             
             try:
-                unit_price_clean = unit_price_str.replace(',', '')
-                unit_price = float(unit_price_clean)
+                unit_price = float(unit_price_str.replace(',', ''))
             except ValueError:
-                print(f"Line {line_num}: Skipped (invalid UnitPrice: '{unit_price_str}')")
-                skipped_count += 1
-                continue
+                unit_price_str = unit_price_str.strip()
+                try:
+                    unit_price = float(unit_price_str.replace(',', ''))
+                except ValueError:
+                    skip_row((line_num, f"invalid UnitPrice: '{unit_price_str}'"))
+                    continue
             
-            # Create transaction dictionary
-            transaction = {
-                'TransactionID': transaction_id,
-                'Date': date,
-                'ProductID': product_id,
-                'ProductName': product_name_clean,
+            # Create transaction dictionary, stripping each text field once
+            # (ProductName: remove commas, replace with space)
+            append_transaction({
+                'TransactionID': transaction_id.strip(),
+                'Date': date.strip(),
+                'ProductID': product_id.strip(),
+                'ProductName': product_name.strip().replace(',', ' '),
                 'Quantity': quantity,
                 'UnitPrice': unit_price,
-                'CustomerID': customer_id,
-                'Region': region
-            }
-            
-            transactions.append(transaction)
+                'CustomerID': customer_id.strip(),
+                'Region': region.strip()
+            })
             
         except Exception as e:
-            print(f"Line {line_num}: Skipped (parsing error: {e})")
-            skipped_count += 1
+            skip_row((line_num, f"parsing error: {e}"))
             continue
     
+    # Report skipped lines in one write
+    shown = skipped_rows if verbose else skipped_rows[:10]
+    if shown:
+        print('\n'.join(f"Line {line_num}: Skipped ({reason})" for line_num, reason in shown))
+    if len(skipped_rows) > len(shown):
+        print(f"  ... and {len(skipped_rows) - len(shown)} more skipped lines")
+    
     print(f"\n✓ Successfully parsed: {len(transactions)} transactions")
-    print(f"✗ Skipped: {skipped_count} lines")
+    print(f"✗ Skipped: {len(skipped_rows)} lines")
     print("="*60)
     
     return transactions
 
 
-def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
+class TransactionColumns:
+    """
+    Column-oriented view of a list of transactions (one array per field)
+    
+    Steps that look at one field of every transaction read it as a
+    single array instead of looking it up in each dictionary again.
+    Columns are extracted on first use, so only the fields that are
+    actually read get converted, and each of them only once.
+    
+    Columns:
+    - quantity:   Quantity values (int64 array for parsed transactions)
+    - unit_price: UnitPrice values (float64 array for parsed transactions)
+    - region:     tuple (codes, regions) - int64 index of each transaction's
+                  Region in regions, the distinct Region values in order of
+                  first appearance (there are only a handful of them)
+    - amount:     Quantity * UnitPrice per transaction
+    """
+    
+    def __init__(self, transactions):
+        self.transactions = transactions
+    
+    def __len__(self):
+        return len(self.transactions)
+    
+    @cached_property
+    def quantity(self):
+        return np.array([t['Quantity'] for t in self.transactions])
+    
+    @cached_property
+    def unit_price(self):
+        return np.array([t['UnitPrice'] for t in self.transactions])
+    
+    @cached_property
+    def region(self):
+        index = {}
+        codes = np.fromiter((index.setdefault(t['Region'], len(index)) for t in self.transactions),
+                            dtype=np.int64, count=len(self.transactions))
+        return codes, list(index)
+    
+    @cached_property
+    def amount(self):
+        return self.quantity * self.unit_price
+
+
+def blank_mask(transactions, field):
+    """
+    Returns: boolean array, True where field is missing or blank
+             (its text is empty after stripping whitespace)
+    """
+    try:
+        stripped = map(str.strip, map(itemgetter(field), transactions))
+        return ~np.fromiter(map(bool, stripped), dtype=bool, count=len(transactions))
+    except (KeyError, TypeError):
+        # Missing fields or values that are not text
+        return np.array([field not in t or not str(t[field]).strip() for t in transactions], dtype=bool)
+
+
+def positive_mask(transactions, field):
+    """
+    Returns: boolean array, False where field is <= 0 (missing counts as 0)
+    
+    Written as "not <= 0" like the row check, so NaN counts as positive
+    and values that cannot be compared raise the same TypeError.
+    """
+    try:
+        values = map(itemgetter(field), transactions)
+        return ~np.fromiter(map(le, values, repeat(0)), dtype=bool, count=len(transactions))
+    except KeyError:
+        return np.array([not (t.get(field, 0) <= 0) for t in transactions], dtype=bool)
+
+
+def prefix_mask(transactions, field, prefix):
+    """
+    Returns: boolean array, True where the text of field starts with prefix
+    """
+    try:
+        values = map(itemgetter(field), transactions)
+        return np.fromiter(map(str.startswith, values, repeat(prefix)),
+                           dtype=bool, count=len(transactions))
+    except (KeyError, TypeError):
+        return np.array([str(t.get(field, '')).startswith(prefix) for t in transactions], dtype=bool)
+
+
+def invalid_reasons(trans):
+    """
+    Returns: list of the validation rules a transaction breaks
+    """
+    reasons = []
+    
+    # Rule 1: All required fields must be present (not empty)
+    for field in REQUIRED_FIELDS:
+        if field not in trans or not str(trans[field]).strip():
+            reasons.append(f"Missing {field}")
+    
+    # Rule 2: Quantity must be > 0
+    if trans.get('Quantity', 0) <= 0:
+        reasons.append(f"Invalid Quantity ({trans.get('Quantity')})")
+    
+    # Rule 3: UnitPrice must be > 0
+    if trans.get('UnitPrice', 0) <= 0:
+        reasons.append(f"Invalid UnitPrice ({trans.get('UnitPrice')})")
+    
+    # Rule 4: TransactionID must start with 'T'
+    if not str(trans.get('TransactionID', '')).startswith('T'):
+        reasons.append(f"Invalid TransactionID format ({trans.get('TransactionID')})")
+    
+    # Rule 5: ProductID must start with 'P'
+    if not str(trans.get('ProductID', '')).startswith('P'):
+        reasons.append(f"Invalid ProductID format ({trans.get('ProductID')})")
+    
+    # Rule 6: CustomerID must start with 'C'
+    if not str(trans.get('CustomerID', '')).startswith('C'):
+        reasons.append(f"Invalid CustomerID format ({trans.get('CustomerID')})")
+    
+    return reasons
+
+
+def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None,
+                        verbose=False):
     """
     Validates transactions and applies optional filters
     
@@ -269,6 +526,11 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     - region: filter by specific region (optional)
     - min_amount: minimum transaction amount (Quantity * UnitPrice) (optional)
     - max_amount: maximum transaction amount (optional)
+    - verbose: list every invalid transaction instead of the first 5
+    
+    The returned transactions are the input dictionaries, unchanged: the
+    amount (Quantity * UnitPrice) is only computed as an array for the
+    insights and the amount filters.
     
     Returns: tuple (valid_transactions, invalid_count, filter_summary)
     
@@ -308,81 +570,63 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     
     # Step 1: Validation
     print("\n--- STEP 1: VALIDATION ---")
-    valid_transactions = []
-    invalid_count = 0
+    # Every rule is checked for all transactions at once, one field
+    # at a time, and the results are combined into one mask
+    valid = np.ones(total_input, dtype=bool)
     
-    for trans in transactions:
-        is_valid = True
-        reasons = []
-        
-        # Rule 1: All required fields must be present (not empty)
-        required_fields = ['TransactionID', 'Date', 'ProductID', 'ProductName', 
-                          'Quantity', 'UnitPrice', 'CustomerID', 'Region']
-        for field in required_fields:
-            if field not in trans or not str(trans[field]).strip():
-                is_valid = False
-                reasons.append(f"Missing {field}")
-        
-        # Rule 2: Quantity must be > 0
-        if trans.get('Quantity', 0) <= 0:
-            is_valid = False
-            reasons.append(f"Invalid Quantity ({trans.get('Quantity')})")
-        
-        # Rule 3: UnitPrice must be > 0
-        if trans.get('UnitPrice', 0) <= 0:
-            is_valid = False
-            reasons.append(f"Invalid UnitPrice ({trans.get('UnitPrice')})")
-        
-        # Rule 4: TransactionID must start with 'T'
-        if not str(trans.get('TransactionID', '')).startswith('T'):
-            is_valid = False
-            reasons.append(f"Invalid TransactionID format ({trans.get('TransactionID')})")
-        
-        # Rule 5: ProductID must start with 'P'
-        if not str(trans.get('ProductID', '')).startswith('P'):
-            is_valid = False
-            reasons.append(f"Invalid ProductID format ({trans.get('ProductID')})")
-        
-        # Rule 6: CustomerID must start with 'C'
-        if not str(trans.get('CustomerID', '')).startswith('C'):
-            is_valid = False
-            reasons.append(f"Invalid CustomerID format ({trans.get('CustomerID')})")
-        
-        if is_valid:
-            valid_transactions.append(trans)
-        else:
-            invalid_count += 1
-            if invalid_count <= 5:  # Show first 5 invalid records
-                print(f"  Invalid: {trans.get('TransactionID', 'N/A')} - {', '.join(reasons)}")
+    # Rule 1: All required fields must be present (not empty)
+    for field in TEXT_FIELDS:
+        valid &= ~blank_mask(transactions, field)
     
-    if invalid_count > 5:
-        print(f"  ... and {invalid_count - 5} more invalid records")
+    # Rules 2-3: Quantity and UnitPrice must be > 0
+    valid &= positive_mask(transactions, 'Quantity')
+    valid &= positive_mask(transactions, 'UnitPrice')
+    
+    # Rules 4-6: TransactionID, ProductID and CustomerID prefixes
+    valid &= prefix_mask(transactions, 'TransactionID', 'T')
+    valid &= prefix_mask(transactions, 'ProductID', 'P')
+    valid &= prefix_mask(transactions, 'CustomerID', 'C')
+    
+    valid_transactions = list(compress(transactions, valid.tolist()))
+    invalid_rows = np.flatnonzero(~valid).tolist()
+    invalid_count = len(invalid_rows)
+    
+    # Show first 5 invalid records (all with verbose) with the rules they break
+    shown = invalid_rows if verbose else invalid_rows[:5]
+    if shown:
+        print('\n'.join(f"  Invalid: {transactions[i].get('TransactionID', 'N/A')} - "
+                        f"{', '.join(invalid_reasons(transactions[i]))}" for i in shown))
+    
+    if invalid_count > len(shown):
+        print(f"  ... and {invalid_count - len(shown)} more invalid records")
     
     print(f"\n✓ Valid transactions: {len(valid_transactions)}")
     print(f"✗ Invalid transactions: {invalid_count}")
     
-    # Calculate transaction amounts
-    for trans in valid_transactions:
-        trans['Amount'] = trans['Quantity'] * trans['UnitPrice']
+    # Calculate transaction amounts (one multiply over the columns; the
+    # transaction dictionaries themselves are left unchanged)
+    columns = TransactionColumns(valid_transactions)
+    amounts = columns.amount.tolist()
     
     # Display available data insights
     print("\n--- DATA INSIGHTS ---")
     
     # Show available regions
-    regions = sorted(set(trans['Region'] for trans in valid_transactions))
+    region_codes, region_names = columns.region
+    regions = sorted(region_names)
     print(f"Available regions: {', '.join(regions)}")
     
     # Show amount range
-    amounts = [trans['Amount'] for trans in valid_transactions]
     if amounts:
-        min_total = min(amounts)
-        max_total = max(amounts)
+        min_total = columns.amount.min()
+        max_total = columns.amount.max()
         avg_total = sum(amounts) / len(amounts)
         print(f"Transaction amount range: ₹{min_total:,.2f} - ₹{max_total:,.2f}")
         print(f"Average transaction amount: ₹{avg_total:,.2f}")
     
     # Step 2: Apply Filters
-    filtered_transactions = valid_transactions.copy()
+    # All filters update one keep-mask; transactions are selected once at the end
+    keep = np.ones(len(valid_transactions), dtype=bool)
     filtered_by_region = 0
     filtered_by_amount = 0
     
@@ -390,29 +634,39 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     if region:
         print(f"\n--- STEP 2: FILTERING BY REGION ---")
         print(f"Filter: Region = '{region}'")
-        before_count = len(filtered_transactions)
-        filtered_transactions = [t for t in filtered_transactions if t['Region'] == region]
-        after_count = len(filtered_transactions)
+        before_count = len(valid_transactions)
+        if region in region_names:
+            keep &= region_codes == region_names.index(region)
+        else:
+            keep[:] = False
+        after_count = np.count_nonzero(keep)
         filtered_by_region = before_count - after_count
         print(f"Records after region filter: {after_count} (removed {filtered_by_region})")
     
     # Filter by Amount Range
     if min_amount is not None or max_amount is not None:
         print(f"\n--- STEP 3: FILTERING BY AMOUNT ---")
-        before_count = len(filtered_transactions)
+        before_count = np.count_nonzero(keep)
         
         if min_amount is not None:
             print(f"Filter: Amount >= ₹{min_amount:,.2f}")
-            filtered_transactions = [t for t in filtered_transactions if t['Amount'] >= min_amount]
+            keep &= columns.amount >= min_amount
         
         if max_amount is not None:
             print(f"Filter: Amount <= ₹{max_amount:,.2f}")
-            filtered_transactions = [t for t in filtered_transactions if t['Amount'] <= max_amount]
+            keep &= columns.amount <= max_amount
         
-        after_count = len(filtered_transactions)
+        after_count = np.count_nonzero(keep)
         filtered_by_amount = before_count - after_count
         print(f"Records after amount filter: {after_count} (removed {filtered_by_amount})")
     
+    # valid_transactions is already a new list, so it is returned as is
+    # unless a filter removed something
+    if keep.all():
+        filtered_transactions = valid_transactions
+    else:
+        filtered_transactions = list(compress(valid_transactions, keep.tolist()))
+    
     # Create summary
     filter_summary = {
         'total_input': total_input,
@@ -448,8 +702,7 @@ def display_sample_transactions(transactions, count=5):
         print(f"   Date: {trans['Date']}")
         print(f"   Product: {trans['ProductName']} ({trans['ProductID']})")
         print(f"   Quantity: {trans['Quantity']} x ₹{trans['UnitPrice']:,.2f}")
-        if 'Amount' in trans:
-            print(f"   Total: ₹{trans['Amount']:,.2f}")
+        print(f"   Total: ₹{trans['Quantity'] * trans['UnitPrice']:,.2f}")
         print(f"   Customer: {trans['CustomerID']} | Region: {trans['Region']}")
 
 
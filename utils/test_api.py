@@ -2,6 +2,8 @@
 Test script for data enrichment functions
 """
 
+import numpy as np
+
 from file_handler import read_sales_data
 from file_handler import parse_transactions, validate_and_filter
 from api_handler import fetch_all_products
@@ -13,6 +15,21 @@ from api_handler import (
     save_enriched_data
 )
 
+def most_common(values, mask, n=5):
+    """
+    Counts the values selected by mask
+    Returns: list of (value, count) for the n most common values, ties
+             in order of first appearance (like Counter.most_common)
+    """
+    values = values[mask]
+    if not len(values):
+        return []
+    
+    uniques, first_index, counts = np.unique(values, return_index=True, return_counts=True)
+    order = np.lexsort((first_index, -counts))[:n]
+    return [(uniques[i], int(counts[i])) for i in order]
+
+
 def main():
     print("="*80)
     print(" "*20 + "DATA ENRICHMENT TEST")
@@ -47,7 +64,7 @@ def main():
     
     print(f"\nSample mapping (first 5 products):")
     for product_id, info in list(product_mapping.items())[:5]:
-        print(f"  ID {product_id}: {info['title']} ({info['category']}) - {info['brand']}")
+        print(f"  ID {product_id}: {info.title} ({info.category}) - {info.brand}")
     
     # Step 4: Enrich sales data
     print("\n" + "="*80)
@@ -99,22 +116,18 @@ def main():
     print("\n[STEP 7] Enrichment Analysis")
     print("="*80)
     
-    matched = sum(1 for t in enriched_trans if t.get('API_Match'))
-    unmatched = len(enriched_trans) - matched
+    # One array per enriched field
+    api_match = np.array([bool(t.get('API_Match')) for t in enriched_trans], dtype=bool)
+    api_category = np.array([t.get('API_Category') for t in enriched_trans], dtype=object)
+    api_brand = np.array([t.get('API_Brand') for t in enriched_trans], dtype=object)
+    api_rating = np.array([t.get('API_Rating') for t in enriched_trans], dtype=object)
     
-    # Count by category (for matched transactions)
-    from collections import Counter
-    categories = Counter(
-        t['API_Category'] 
-        for t in enriched_trans 
-        if t.get('API_Match') and t.get('API_Category')
-    )
+    matched = int(np.count_nonzero(api_match))
+    unmatched = len(enriched_trans) - matched
     
-    brands = Counter(
-        t['API_Brand'] 
-        for t in enriched_trans 
-        if t.get('API_Match') and t.get('API_Brand')
-    )
+    # Count by category and brand (for matched transactions)
+    categories = most_common(api_category, api_match & api_category.astype(bool))
+    brands = most_common(api_brand, api_match & api_brand.astype(bool))
     
     print(f"\n📊 Overall Statistics:")
     print(f"  Total transactions:    {len(enriched_trans)}")
@@ -123,23 +136,20 @@ def main():
     
     if categories:
         print(f"\n📦 Top 5 Categories (from API):")
-        for cat, count in categories.most_common(5):
+        for cat, count in categories:
             print(f"  {cat}: {count} transactions")
     
     if brands:
         print(f"\n🏢 Top 5 Brands (from API):")
-        for brand, count in brands.most_common(5):
+        for brand, count in brands:
             print(f"  {brand}: {count} transactions")
     
     # Average rating for matched products
-    ratings = [
-        t['API_Rating'] 
-        for t in enriched_trans 
-        if t.get('API_Match') and t.get('API_Rating') is not None
-    ]
-    
-    if ratings:
-        avg_rating = sum(ratings) / len(ratings)
+    has_rating = np.array([rating is not None for rating in api_rating.tolist()], dtype=bool)
+    ratings = api_rating[api_match & has_rating].astype(np.float64)
+    
+    if len(ratings):
+        avg_rating = ratings.mean()
         print(f"\n⭐ Average Product Rating: {avg_rating:.2f}/5.0")
     
     print("\n" + "="*80)